@@ -6,9 +6,17 @@ and comprehensive logging for LibreTranslate
 
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
+import re
 import time
+import threading
+import queue
+import asyncio
+from concurrent.futures import Future
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -28,27 +36,188 @@ except ImportError:
     DEEP_TRANSLATOR_AVAILABLE = False
     logger.warning("deep-translator not available")
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    logger.warning("aiohttp not available - concurrent translation disabled")
+
+
+def _create_session(pool_connections=4, pool_maxsize=16):
+    """Create a requests.Session with keep-alive pooling and retries"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(['GET', 'POST'])
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    return session
+
+
+class TranslationCache:
+    """Thread-safe LRU cache of translations with a time-to-live"""
+    
+    def __init__(self, maxsize=4096, ttl=3600, max_text_length=500):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_text_length = max_text_length
+        self._entries = OrderedDict()  # key -> (translation, timestamp)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text, source_lang, target_lang):
+        """Normalize a request into a cache key"""
+        return (text.strip().lower(), source_lang, target_lang)
+    
+    def get(self, key):
+        """Return the cached translation or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                translation, timestamp = entry
+                if time.monotonic() - timestamp < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return translation
+                del self._entries[key]
+            self.misses += 1
+            return None
+    
+    def put(self, key, translation):
+        """Store a successful translation"""
+        if not translation or len(key[0]) > self.max_text_length:
+            return
+        with self._lock:
+            self._entries[key] = (translation, time.monotonic())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def info(self):
+        """Cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": f"{(self.hits / total * 100) if total else 0:.1f}%"
+        }
+
+
+# Filler words the transcriber emits that aren't worth a translation request;
+# they are passed through unchanged
+_SKIP_PHRASES = frozenset({
+    "okay", "ok", "yes", "no", "uh", "um", "mm", "hmm", "yeah", "thanks",
+    "mm-hmm", "uh-huh"
+})
+_NON_ALPHA_RE = re.compile(r"^[\W_]*$")
+
+
+def _is_untranslatable(text):
+    """True for fillers and text without any letters or digits"""
+    return text.lower().strip(" .,!?…") in _SKIP_PHRASES or _NON_ALPHA_RE.match(text) is not None
+
+
+# One keep-alive pool for every LibreTranslate probe and request in the
+# process, so translators created on module restarts reuse its connections
+_shared_session = _create_session()
+
+# The language list doesn't change for the lifetime of a LibreTranslate
+# container, so successful probes are remembered in-process and, for a few
+# minutes, across processes
+_LIBRETRANSLATE_OK_FILE = '/tmp/libretranslate_ok'
+_LIBRETRANSLATE_OK_MAX_AGE = 300  # seconds
+_libretranslate_languages = {}  # url -> language list
+
+
+def _probe_libretranslate(url, timeout=10):
+    """Return LibreTranslate's language list for url, or None if unreachable"""
+    languages = _libretranslate_languages.get(url)
+    if languages is not None:
+        return languages
+    
+    try:
+        if time.time() - os.path.getmtime(_LIBRETRANSLATE_OK_FILE) < _LIBRETRANSLATE_OK_MAX_AGE:
+            with open(_LIBRETRANSLATE_OK_FILE, 'r', encoding='utf-8') as f:
+                cookie = json.load(f)
+            if cookie.get("url") == url:
+                languages = _libretranslate_languages[url] = cookie.get("languages", [])
+                return languages
+    except (OSError, ValueError, AttributeError):
+        pass
+    
+    response = _shared_session.get(f"{url}/languages", timeout=timeout)
+    if response.status_code != 200:
+        return None
+    
+    languages = _libretranslate_languages[url] = response.json()
+    try:
+        with open(_LIBRETRANSLATE_OK_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"url": url, "languages": languages}, f)
+    except OSError:
+        pass
+    return languages
+
 
 class LibreTranslateWrapper:
     """LibreTranslate wrapper with comprehensive logging"""
     
+    CACHE_SIZE = 4096
+    CACHE_TTL = 3600  # seconds
+    
+    # The JSON Lines log is trimmed back to LOG_MAX_ENTRIES once it grows
+    # past LOG_ROTATE_BYTES
+    LOG_MAX_ENTRIES = 1000
+    LOG_ROTATE_BYTES = 2 * 1024 * 1024
+    
     def __init__(self, url="http://libretranslate:5000", log_translations=True):
         self.url = url
         self.log_translations = log_translations
-        self.translation_log_file = '/app/translations/libretranslate_log.json'
+        self.translation_log_file = '/app/translations/libretranslate_log.jsonl'
+        self._log_handle = None
+        self._log_lock = threading.Lock()
+        # Log entries are written by a background thread so the request
+        # path never touches the disk
+        self._log_queue = queue.SimpleQueue()
+        self._log_thread = None
         self.translation_count = 0
         self.error_count = 0
+        self.concurrent_count = 0  # Requests sent together through translate_many
         self.session_start = datetime.now()
         
+        # Process-wide session so every request reuses the keep-alive connection
+        self.session = _shared_session
+        
+        # Identical segments (filler phrases, repeats) skip the round-trip
+        self.cache = TranslationCache(maxsize=self.CACHE_SIZE, ttl=self.CACHE_TTL)
+        
+        # Background event loop + aiohttp session for concurrent requests,
+        # created on first use
+        self._async_loop = None
+        self._async_thread = None
+        self._async_session = None
+        self._async_lock = threading.Lock()
+        
         # Test connection
         self._test_connection()
     
     def _test_connection(self):
         """Test LibreTranslate connection"""
         try:
-            response = requests.get(f"{self.url}/languages", timeout=5)
-            if response.status_code == 200:
-                languages = response.json()
+            languages = _probe_libretranslate(self.url, timeout=5)
+            if languages is not None:
                 logger.info(f"✅ LibreTranslate connected at {self.url}")
                 logger.info(f"   Available languages: {len(languages)}")
                 # Log first few languages
@@ -57,7 +226,7 @@ class LibreTranslateWrapper:
                 if len(languages) > 5:
                     logger.info(f"   ... and {len(languages) - 5} more languages")
             else:
-                logger.error(f"❌ LibreTranslate connection failed: {response.status_code}")
+                logger.error(f"❌ LibreTranslate connection failed at {self.url}")
         except Exception as e:
             logger.error(f"❌ Cannot connect to LibreTranslate at {self.url}: {e}")
     
@@ -75,16 +244,28 @@ class LibreTranslateWrapper:
             logger.debug(f"Text too short to translate: '{text}'")
             return None
         
+        # Fillers and punctuation-only text don't need a round-trip
+        if _is_untranslatable(text):
+            return text
+        
+        cache_key = self.cache.make_key(text, source_lang, target_lang)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"Translation cache hit: '{text[:50]}'")
+            return cached
+        
         # Log the translation request
         request_id = f"{self.session_start.strftime('%Y%m%d_%H%M%S')}_{self.translation_count:04d}"
         self.translation_count += 1
         
-        logger.info(f"🔄 LibreTranslate Request #{self.translation_count}")
-        logger.info(f"   Request ID: {request_id}")
-        logger.info(f"   Source language: {source_lang}")
-        logger.info(f"   Target language: {target_lang}")
-        logger.info(f"   Text length: {len(text)} characters")
-        logger.info(f"   Text preview: {text[:100]}{'...' if len(text) > 100 else ''}")
+        # Check the level once - formatting is skipped entirely when INFO is off
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info(
+                "🔄 LibreTranslate Request #%d (id=%s) %s → %s, %d chars: %s",
+                self.translation_count, request_id, source_lang, target_lang, len(text),
+                text if log_details and len(text) <= 500 else text[:100] + ('...' if len(text) > 100 else '')
+            )
         
         # Prepare request
         request_data = {
@@ -94,35 +275,31 @@ class LibreTranslateWrapper:
             "format": "text"
         }
         
-        # Log full text if enabled
-        if log_details and len(text) <= 500:
-            logger.info(f"   Full text: {text}")
-        
         try:
             # Make translation request
             start_time = time.time()
-            response = requests.post(
+            response = self.session.post(
                 f"{self.url}/translate",
                 json=request_data,
-                headers={"Content-Type": "application/json"},
                 timeout=30
             )
             elapsed_time = time.time() - start_time
             
-            # Log response details
-            logger.info(f"   Response time: {elapsed_time:.2f}s")
-            logger.info(f"   Status code: {response.status_code}")
-            
             if response.status_code == 200:
                 result = response.json()
                 translated_text = result.get("translatedText", "")
                 detected_language = result.get("detectedLanguage", {})
                 
-                logger.info(f"✅ Translation successful")
-                if detected_language and source_lang == 'auto':
-                    logger.info(f"   Detected language: {detected_language.get('language', 'N/A')} "
-                              f"(confidence: {detected_language.get('confidence', 'N/A')})")
-                logger.info(f"   Translated preview: {translated_text[:100]}{'...' if len(translated_text) > 100 else ''}")
+                if verbose:
+                    detected = ""
+                    if detected_language and source_lang == 'auto':
+                        detected = (f" [detected {detected_language.get('language', 'N/A')}, "
+                                    f"confidence {detected_language.get('confidence', 'N/A')}]")
+                    logger.info(
+                        "✅ Translation successful in %.2fs%s: %s",
+                        elapsed_time, detected,
+                        translated_text[:100] + ('...' if len(translated_text) > 100 else '')
+                    )
                 
                 # Save to log file
                 if self.log_translations:
@@ -139,13 +316,13 @@ class LibreTranslateWrapper:
                         "success": True
                     })
                 
+                self.cache.put(cache_key, translated_text)
                 return translated_text
                 
             else:
                 error_msg = f"LibreTranslate API error: {response.status_code}"
                 error_details = response.text
-                logger.error(f"❌ {error_msg}")
-                logger.error(f"   Error details: {error_details[:200]}")
+                logger.error("❌ %s after %.2fs: %s", error_msg, elapsed_time, error_details[:200])
                 
                 # Save error to log
                 if self.log_translations:
@@ -200,34 +377,248 @@ class LibreTranslateWrapper:
                 })
             return None
     
-    def _save_translation_log(self, log_entry):
-        """Save translation log entry to file"""
+    def translate_batch(self, texts, source_lang='auto', target_lang='en'):
+        """Translate several texts with a single /translate request
+        
+        Returns a list with one translation (or None) per input text.
+        """
+        results = [None] * len(texts)
+        pending = []  # (index, text, cache_key)
+        
+        for i, text in enumerate(texts):
+            text = text.strip() if text else ''
+            if len(text) < 3:
+                continue
+            if _is_untranslatable(text):
+                results[i] = text
+                continue
+            cache_key = self.cache.make_key(text, source_lang, target_lang)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, text, cache_key))
+        
+        if not pending:
+            return results
+        
+        request_id = f"{self.session_start.strftime('%Y%m%d_%H%M%S')}_{self.translation_count:04d}"
+        self.translation_count += len(pending)
+        logger.info(f"🔄 LibreTranslate batch of {len(pending)} texts ({source_lang} → {target_lang}), "
+                    f"request ID: {request_id}")
+        
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.translation_log_file), exist_ok=True)
+            start_time = time.time()
+            response = self.session.post(
+                f"{self.url}/translate",
+                json={
+                    "q": [text for _, text, _ in pending],
+                    "source": source_lang,
+                    "target": target_lang,
+                    "format": "text"
+                },
+                timeout=30
+            )
+            elapsed_time = time.time() - start_time
             
-            # Read existing logs
-            logs = []
-            if os.path.exists(self.translation_log_file):
-                try:
-                    with open(self.translation_log_file, 'r', encoding='utf-8') as f:
-                        logs = json.load(f)
-                except:
-                    logs = []
+            if response.status_code != 200:
+                logger.error(f"❌ LibreTranslate API error: {response.status_code}")
+                logger.error(f"   Error details: {response.text[:200]}")
+                self.error_count += len(pending)
+                return results
             
-            # Add new entry
-            logs.append(log_entry)
+            translated = response.json().get("translatedText", [])
+            logger.info(f"✅ Batch translation successful in {elapsed_time:.2f}s")
             
-            # Keep only last 1000 entries
-            if len(logs) > 1000:
-                logs = logs[-1000:]
+            for (i, text, cache_key), translated_text in zip(pending, translated):
+                results[i] = translated_text
+                self.cache.put(cache_key, translated_text)
+                if self.log_translations:
+                    self._save_translation_log({
+                        "request_id": request_id,
+                        "timestamp": datetime.now().isoformat(),
+                        "source_lang": source_lang,
+                        "target_lang": target_lang,
+                        "text_length": len(text),
+                        "original_text": text if len(text) <= 1000 else text[:1000] + "...",
+                        "translated_text": translated_text,
+                        "response_time": elapsed_time,
+                        "batch_size": len(pending),
+                        "success": True
+                    })
             
-            # Write back
-            with open(self.translation_log_file, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
-                
         except Exception as e:
-            logger.error(f"Failed to save translation log: {e}")
+            logger.error(f"❌ Batch translation error: {e}")
+            self.error_count += len(pending)
+        
+        return results
+    
+    def _get_async_loop(self):
+        """Start the background event loop used for concurrent requests"""
+        with self._async_lock:
+            if self._async_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="LibreTranslateAsync", daemon=True
+                )
+                thread.start()
+                self._async_loop = loop
+                self._async_thread = thread
+            return self._async_loop
+    
+    async def translate_async(self, text, source_lang='auto', target_lang='en'):
+        """Translate text without blocking the event loop"""
+        if not text or len(text.strip()) < 3:
+            return None
+        
+        text = text.strip()
+        if _is_untranslatable(text):
+            return text
+        
+        cache_key = self.cache.make_key(text, source_lang, target_lang)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if self._async_session is None:
+            self._async_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        
+        request_id = f"{self.session_start.strftime('%Y%m%d_%H%M%S')}_{self.translation_count:04d}"
+        self.translation_count += 1
+        start_time = time.time()
+        try:
+            async with self._async_session.post(
+                f"{self.url}/translate",
+                json={
+                    "q": text,
+                    "source": source_lang,
+                    "target": target_lang,
+                    "format": "text"
+                }
+            ) as response:
+                if response.status != 200:
+                    error_msg = f"LibreTranslate API error: {response.status}"
+                    error_details = await response.text()
+                    elapsed_time = time.time() - start_time
+                    logger.error("❌ %s after %.2fs: %s", error_msg, elapsed_time, error_details[:200])
+                    if self.log_translations:
+                        self._save_translation_log({
+                            "request_id": request_id,
+                            "timestamp": datetime.now().isoformat(),
+                            "source_lang": source_lang,
+                            "target_lang": target_lang,
+                            "text_length": len(text),
+                            "original_text": text[:200] + "..." if len(text) > 200 else text,
+                            "error": error_msg,
+                            "error_details": error_details[:500],
+                            "response_time": elapsed_time,
+                            "success": False
+                        })
+                    self.error_count += 1
+                    return None
+                result = await response.json()
+            
+            elapsed_time = time.time() - start_time
+            translated_text = result.get("translatedText", "")
+            logger.info(f"✅ Translation successful in {elapsed_time:.2f}s: "
+                        f"{translated_text[:100]}")
+            if self.log_translations:
+                self._save_translation_log({
+                    "request_id": request_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "source_lang": source_lang,
+                    "target_lang": target_lang,
+                    "text_length": len(text),
+                    "original_text": text if len(text) <= 1000 else text[:1000] + "...",
+                    "translated_text": translated_text,
+                    "detected_language": result.get("detectedLanguage", {}),
+                    "response_time": elapsed_time,
+                    "success": True
+                })
+            self.cache.put(cache_key, translated_text)
+            return translated_text
+            
+        except Exception as e:
+            logger.error(f"❌ Translation error: {e}")
+            self.error_count += 1
+            if self.log_translations:
+                self._save_translation_log({
+                    "request_id": request_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "source_lang": source_lang,
+                    "target_lang": target_lang,
+                    "text_length": len(text),
+                    "error": str(e) or type(e).__name__,
+                    "success": False
+                })
+            return None
+    
+    def translate_many(self, requests_list):
+        """Translate several (text, source_lang, target_lang) requests concurrently
+        
+        Returns one translation (or None) per request. Falls back to
+        sequential requests when aiohttp is not installed.
+        """
+        self.concurrent_count += len(requests_list)
+        if not AIOHTTP_AVAILABLE:
+            return [self.translate(text, source_lang, target_lang)
+                    for text, source_lang, target_lang in requests_list]
+        
+        async def gather():
+            return await asyncio.gather(*(
+                self.translate_async(text, source_lang, target_lang)
+                for text, source_lang, target_lang in requests_list
+            ))
+        
+        return asyncio.run_coroutine_threadsafe(gather(), self._get_async_loop()).result()
+    
+    def _open_translation_log(self):
+        """Open the translation log for appending (once)"""
+        os.makedirs(os.path.dirname(self.translation_log_file), exist_ok=True)
+        # Line buffered so every entry is visible to log viewers right away
+        self._log_handle = open(self.translation_log_file, 'a', encoding='utf-8', buffering=1)
+    
+    def _rotate_translation_log(self):
+        """Keep only the last LOG_MAX_ENTRIES lines of the translation log"""
+        self._log_handle.close()
+        with open(self.translation_log_file, 'r', encoding='utf-8') as f:
+            tail = deque(f, maxlen=self.LOG_MAX_ENTRIES)
+        with open(self.translation_log_file, 'w', encoding='utf-8') as f:
+            f.writelines(tail)
+        self._open_translation_log()
+    
+    def _save_translation_log(self, log_entry):
+        """Queue a translation log entry for the background writer"""
+        if self._log_thread is None:
+            with self._log_lock:
+                if self._log_thread is None:
+                    self._log_thread = threading.Thread(
+                        target=self._translation_log_writer, daemon=True
+                    )
+                    self._log_thread.start()
+        self._log_queue.put(log_entry)
+    
+    def _translation_log_writer(self):
+        """Append queued entries to the JSON Lines log until close()"""
+        while True:
+            log_entry = self._log_queue.get()
+            if log_entry is None:
+                break
+            try:
+                with self._log_lock:
+                    if self._log_handle is None:
+                        self._open_translation_log()
+                    
+                    self._log_handle.write(json.dumps(log_entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+                    
+                    if self._log_handle.tell() > self.LOG_ROTATE_BYTES:
+                        self._rotate_translation_log()
+                    
+            except Exception as e:
+                logger.error(f"Failed to save translation log: {e}")
     
     def get_stats(self):
         """Get translation statistics"""
@@ -238,7 +629,9 @@ class LibreTranslateWrapper:
             "successful": self.translation_count - self.error_count,
             "errors": self.error_count,
             "success_rate": f"{success_rate:.1f}%",
-            "session_start": self.session_start.isoformat()
+            "concurrent_requests": self.concurrent_count,
+            "session_start": self.session_start.isoformat(),
+            "cache": self.cache.info()
         }
         
         logger.info(f"📊 LibreTranslate Statistics:")
@@ -247,8 +640,42 @@ class LibreTranslateWrapper:
         logger.info(f"   Successful: {stats['successful']}")
         logger.info(f"   Errors: {stats['errors']}")
         logger.info(f"   Success rate: {stats['success_rate']}")
+        logger.info(f"   Sent concurrently: {stats['concurrent_requests']}")
+        logger.info(f"   Cache hit rate: {stats['cache']['hit_rate']} ({stats['cache']['size']} entries)")
         
         return stats
+    
+    def close(self):
+        """Flush the translation log and close the async HTTP session
+        
+        The requests session is shared process-wide and stays open.
+        """
+        if self._log_thread is not None:
+            self._log_queue.put(None)
+            self._log_thread.join(timeout=5)
+            self._log_thread = None
+        with self._log_lock:
+            if self._log_handle is not None:
+                self._log_handle.flush()
+                os.fsync(self._log_handle.fileno())
+                self._log_handle.close()
+                self._log_handle = None
+        with self._async_lock:
+            loop, thread = self._async_loop, self._async_thread
+            self._async_loop = self._async_thread = None
+        if loop is not None:
+            if self._async_session is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        self._async_session.close(), loop
+                    ).result(timeout=5)
+                except Exception as e:
+                    logger.warning(f"Error closing aiohttp session: {e}")
+                self._async_session = None
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            if not thread.is_alive():
+                loop.close()
 
 
 class GoogleTranslateWrapper:
@@ -259,6 +686,7 @@ class GoogleTranslateWrapper:
             raise ImportError("googletrans not available")
         self.translator = Translator()
         self.translation_count = 0
+        self.cache = TranslationCache(maxsize=2048)
         logger.info("✅ Google Translate wrapper initialized")
     
     def translate(self, text, source_lang='auto', target_lang='en'):
@@ -266,6 +694,11 @@ class GoogleTranslateWrapper:
         if not text or len(text.strip()) < 2:
             return None
         
+        cache_key = self.cache.make_key(text, source_lang, target_lang)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         self.translation_count += 1
         logger.info(f"🔄 Google Translate Request #{self.translation_count}")
         logger.info(f"   Languages: {source_lang} → {target_lang}")
@@ -276,6 +709,7 @@ class GoogleTranslateWrapper:
             translated = result.text if hasattr(result, 'text') else str(result)
             logger.info(f"✅ Translation successful")
             logger.info(f"   Result: {translated[:100]}{'...' if len(translated) > 100 else ''}")
+            self.cache.put(cache_key, translated)
             return translated
         except Exception as e:
             logger.error(f"❌ Google Translate error: {e}")
@@ -305,6 +739,7 @@ class DeepTranslatorWrapper:
             pass
         
         self.translation_count = 0
+        self.cache = TranslationCache(maxsize=2048)
         logger.info(f"✅ Deep Translator wrapper initialized with {len(self.services)} services")
     
     def translate(self, text, source_lang='auto', target_lang='en'):
@@ -312,6 +747,11 @@ class DeepTranslatorWrapper:
         if not text or len(text.strip()) < 2:
             return None
         
+        cache_key = self.cache.make_key(text, source_lang, target_lang)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         self.translation_count += 1
         logger.info(f"🔄 Deep Translator Request #{self.translation_count}")
         
@@ -331,6 +771,7 @@ class DeepTranslatorWrapper:
                 
                 if result:
                     logger.info(f"✅ {service_name} translation successful")
+                    self.cache.put(cache_key, result)
                     return result
                     
             except Exception as e:
@@ -344,12 +785,28 @@ class DeepTranslatorWrapper:
 class TranslationManager:
     """Main translation manager that handles all translation services"""
     
+    # Micro-batching of concurrent requests for translators with translate_batch
+    BATCH_WINDOW_MS = 50
+    BATCH_MAX = 16
+    
     def __init__(self, preferred_service='auto'):
         self.preferred_service = preferred_service
         self.translator = None
         self.service_name = None
         
+        self._batch_queue = None
+        self._batch_thread = None
+        self._inflight = 0  # translate() calls in progress
+        self._inflight_lock = threading.Lock()
+        
         self._initialize_translator()
+        
+        if hasattr(self.translator, 'translate_batch'):
+            self._batch_queue = queue.Queue()
+            self._batch_thread = threading.Thread(
+                target=self._batch_worker, name="TranslationBatcher", daemon=True
+            )
+            self._batch_thread.start()
     
     def _initialize_translator(self):
         """Initialize the best available translator"""
@@ -365,8 +822,7 @@ class TranslationManager:
             for attempt in range(3):
                 try:
                     logger.info(f"🔄 Attempting to connect to LibreTranslate (attempt {attempt + 1}/3)...")
-                    response = requests.get(f"{libretranslate_url}/languages", timeout=10)
-                    if response.status_code == 200:
+                    if _probe_libretranslate(libretranslate_url, timeout=10) is not None:
                         self.translator = LibreTranslateWrapper(url=libretranslate_url)
                         self.service_name = 'LibreTranslate'
                         logger.info(f"✅ Translation Manager using LibreTranslate at {libretranslate_url}")
@@ -408,11 +864,104 @@ class TranslationManager:
             return None
         
         try:
-            return self.translator.translate(text, source_lang, target_lang)
+            if self._batch_queue is None:
+                return self.translator.translate(text, source_lang, target_lang)
+            
+            with self._inflight_lock:
+                alone = self._inflight == 0
+                self._inflight += 1
+            try:
+                # Nothing to batch with - don't make a lone request wait out the window
+                if alone:
+                    return self.translator.translate(text, source_lang, target_lang)
+                
+                future = Future()
+                self._batch_queue.put((text, source_lang, target_lang, future))
+                return future.result()
+            finally:
+                with self._inflight_lock:
+                    self._inflight -= 1
         except Exception as e:
             logger.error(f"Translation error with {self.service_name}: {e}")
             return None
     
+    def _batch_worker(self):
+        """Coalesce requests arriving within BATCH_WINDOW_MS into batches
+        
+        Only requests that overlap another in-flight translate() get here;
+        a lone request goes straight to the translator. A None item stops
+        the worker.
+        """
+        while True:
+            item = self._batch_queue.get()
+            if item is None:
+                return
+            items = [item]
+            deadline = time.monotonic() + self.BATCH_WINDOW_MS / 1000
+            
+            while len(items) < self.BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._batch_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Stop after serving what was already collected
+                    self._batch_queue.put(None)
+                    break
+                items.append(item)
+            
+            # Only requests for the same language pair can share a call
+            groups = defaultdict(list)
+            for item in items:
+                groups[(item[1], item[2])].append(item)
+            
+            # Lone requests for different language pairs can't be batched,
+            # but their round-trips can overlap
+            singles = [group[0] for group in groups.values() if len(group) == 1]
+            if len(singles) > 1 and hasattr(self.translator, 'translate_many'):
+                try:
+                    results = self.translator.translate_many(
+                        [(text, source_lang, target_lang) for text, source_lang, target_lang, _ in singles]
+                    )
+                    for (_, _, _, future), result in zip(singles, results):
+                        future.set_result(result)
+                except Exception as e:
+                    for _, _, _, future in singles:
+                        if not future.done():
+                            future.set_exception(e)
+            
+            for (source_lang, target_lang), group in groups.items():
+                try:
+                    if group[0][3].done():
+                        continue
+                    
+                    if len(group) == 1:
+                        text, _, _, future = group[0]
+                        future.set_result(self.translator.translate(text, source_lang, target_lang))
+                        continue
+                    
+                    results = self.translator.translate_batch(
+                        [text for text, _, _, _ in group], source_lang, target_lang
+                    )
+                    for (_, _, _, future), result in zip(group, results):
+                        future.set_result(result)
+                except Exception as e:
+                    for _, _, _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+    
+    def close(self):
+        """Stop the batch worker and release the translator's resources"""
+        if self._batch_thread is not None:
+            self._batch_queue.put(None)
+            self._batch_thread.join(timeout=5)
+            self._batch_thread = None
+        if hasattr(self.translator, 'close'):
+            self.translator.close()
+    
     def get_service_info(self):
         """Get information about the current translation service"""
         return {
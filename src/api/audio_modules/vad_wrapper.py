@@ -3,6 +3,7 @@
 Compatibility wrapper for different versions of silero-vad
 """
 import torch
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,6 +38,20 @@ def get_speech_timestamps_compat(audio, model, model_version="5.x", **kwargs):
             return get_speech_timestamps(audio, model, **kwargs)
         except ImportError:
             # Try alternative
+            sampling_rate = kwargs.get('sampling_rate', 16000)
+            threshold = kwargs.get('threshold', 0.5)
+            
+            if hasattr(model, 'audio_forward'):
+                # Score every 512-sample window in one model call
+                # instead of one Python-level call per window
+                with torch.inference_mode():
+                    probs = model.audio_forward(
+                        torch.as_tensor(audio, dtype=torch.float32), sr=sampling_rate
+                    )
+                return _iterate_speech_probs(
+                    probs.reshape(-1).cpu().numpy(), threshold, sampling_rate
+                )
+            
             from silero_vad import VADIterator
             vad_iterator = VADIterator(model)
             
@@ -54,4 +69,107 @@ def get_speech_timestamps_compat(audio, model, model_version="5.x", **kwargs):
     else:
         # For older versions
         speech_timestamps = model(audio, **kwargs)
-        return speech_timestamps
\ No newline at end of file
+        return speech_timestamps
+
+def _iterate_speech_probs(probs, threshold=0.5, sampling_rate=16000,
+                          min_silence_duration_ms=100, speech_pad_ms=30, window_size=512):
+    """Turn per-window speech probabilities into VADIterator-style start/end dicts"""
+    min_silence_samples = sampling_rate * min_silence_duration_ms // 1000
+    speech_pad_samples = sampling_rate * speech_pad_ms // 1000
+    
+    above = probs >= threshold
+    below = probs < threshold - 0.15
+    
+    timestamps = []
+    triggered = False
+    temp_end = 0
+    
+    # Only windows that can change state need Python-level work
+    for i in np.flatnonzero(above | below):
+        current_sample = (int(i) + 1) * window_size
+        
+        if above[i]:
+            temp_end = 0
+            if not triggered:
+                triggered = True
+                timestamps.append({'start': max(0, current_sample - speech_pad_samples - window_size)})
+        elif triggered:
+            if not temp_end:
+                temp_end = current_sample
+            if current_sample - temp_end >= min_silence_samples:
+                timestamps.append({'end': temp_end + speech_pad_samples - window_size})
+                temp_end = 0
+                triggered = False
+    
+    return timestamps
+
+
+def get_speech_timestamps_batched(audio, model, threshold=0.5, sampling_rate=16000,
+                                  min_speech_duration_ms=250, min_silence_duration_ms=100,
+                                  speech_pad_ms=30, window_size=512):
+    """Speech timestamps (in samples) with all windows scored in one model call
+    
+    Same segmentation as silero_vad.get_speech_timestamps; models without
+    audio_forward go through get_speech_timestamps directly.
+    """
+    if not hasattr(model, 'audio_forward'):
+        from silero_vad import get_speech_timestamps
+        return get_speech_timestamps(
+            audio, model, threshold=threshold, sampling_rate=sampling_rate,
+            min_speech_duration_ms=min_speech_duration_ms,
+            min_silence_duration_ms=min_silence_duration_ms,
+            speech_pad_ms=speech_pad_ms, return_seconds=False
+        )
+    
+    with torch.inference_mode():
+        probs = model.audio_forward(audio, sr=sampling_rate)
+    probs = probs.reshape(-1).cpu().numpy()
+    
+    audio_length = len(audio)
+    min_speech_samples = sampling_rate * min_speech_duration_ms / 1000
+    min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
+    speech_pad_samples = int(sampling_rate * speech_pad_ms / 1000)
+    neg_threshold = threshold - 0.15
+    
+    speeches = []
+    start = None
+    temp_end = 0
+    
+    for i, prob in enumerate(probs.tolist()):
+        position = window_size * i
+        
+        if prob >= threshold:
+            temp_end = 0
+            if start is None:
+                start = position
+            continue
+        
+        if prob < neg_threshold and start is not None:
+            if not temp_end:
+                temp_end = position
+            if position - temp_end < min_silence_samples:
+                continue
+            if temp_end - start > min_speech_samples:
+                speeches.append({'start': start, 'end': temp_end})
+            start = None
+            temp_end = 0
+    
+    if start is not None and audio_length - start > min_speech_samples:
+        speeches.append({'start': start, 'end': audio_length})
+    
+    # Pad segments, splitting short gaps between neighbours
+    for i, speech in enumerate(speeches):
+        if i == 0:
+            speech['start'] = int(max(0, speech['start'] - speech_pad_samples))
+        if i != len(speeches) - 1:
+            silence = speeches[i + 1]['start'] - speech['end']
+            if silence < 2 * speech_pad_samples:
+                speech['end'] += int(silence // 2)
+                speeches[i + 1]['start'] = int(max(0, speeches[i + 1]['start'] - silence // 2))
+            else:
+                speech['end'] = int(min(audio_length, speech['end'] + speech_pad_samples))
+                speeches[i + 1]['start'] = int(max(0, speeches[i + 1]['start'] - speech_pad_samples))
+        else:
+            speech['end'] = int(min(audio_length, speech['end'] + speech_pad_samples))
+    
+    return speeches
@@ -1,5 +1,6 @@
 # api-server/audio_modules/voicemeeter.py
 import numpy as np
+import random
 import threading
 import socket
 import struct
@@ -8,16 +9,48 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _downmix_i16_stereo_to_f32(src, dst):
+        """Average interleaved int16 stereo into float32 mono in [-1, 1)"""
+        for i in range(dst.size):
+            dst[i] = (np.int32(src[2 * i]) + np.int32(src[2 * i + 1])) * (1.0 / 65536.0)
+else:
+    def _downmix_i16_stereo_to_f32(src, dst):
+        """Average interleaved int16 stereo into float32 mono in [-1, 1)"""
+        stereo = src.reshape(-1, 2)
+        # int16 sums are exact in float32, so add straight into the output
+        np.add(stereo[:, 0], stereo[:, 1], out=dst, dtype=np.float32)
+        dst *= 1.0 / 65536.0
+
 class VoiceMeeterModule:
     """
     Capture mixed audio from VoiceMeeter via VBAN protocol or TCP stream
     VoiceMeeter can send audio over network using VBAN
     """
     
+    # Packets are collected into chunks of at least this many bytes before
+    # being queued (~85 ms of 48 kHz stereo, about 12 VBAN packets)
+    ENQUEUE_BYTES = 16384
+    
+    # Phrases broadcast by _simulate_transcription
+    _TEST_PHRASES = (
+        ("Audio captured from VoiceMeeter", "en"),
+        ("Testing mixed audio stream", "en"),
+        ("All sources are being recorded", "en")
+    )
+    
     def __init__(self, ws_server, config):
         self.ws_server = ws_server
         self.config = config
         self.running = False
+        self._stop_event = threading.Event()  # Wakes capture threads on stop()
         self.audio_queue = Queue()
         
         # VoiceMeeter settings
@@ -27,12 +60,27 @@ class VoiceMeeterModule:
         self.stream_name = config.get('stream_name', 'Stream1')
         self.sample_rate = config.get('sample_rate', 48000)
         
+        # VBAN stream names are null-padded to 16 bytes in the header, so the
+        # name can be matched as raw bytes without decoding every packet
+        self._match_any_stream = self.stream_name == '*'
+        self._expected_name_bytes = self.stream_name.encode('utf-8')[:16].ljust(16, b'\x00')
+        
         # For audio processing
         self.transcriber = None  # Would integrate with Whisper
         
+        # Ring buffer of interleaved int16 stereo samples (5 seconds).
+        # _ring_w/_ring_r count samples written/read since start.
+        self._ring = np.empty(self.sample_rate * 2 * 5, dtype=np.int16)
+        self._ring_w = 0
+        self._ring_r = 0
+        
+        # Reused output for the mono float32 downmix of each chunk
+        self._float_out = np.empty(self.sample_rate, dtype=np.float32)
+        
     def start(self):
         """Start capturing from VoiceMeeter"""
         self.running = True
+        self._stop_event.clear()
         
         if self.connection_type == 'vban':
             capture_thread = threading.Thread(target=self._capture_vban)
@@ -60,25 +108,30 @@ class VoiceMeeterModule:
             sock.bind(('0.0.0.0', self.port))
             logger.info(f"Listening for VBAN on port {self.port}")
             
-            while self.running:
+            pending = bytearray()
+            
+            # Packets are received into one reusable buffer (VBAN max packet
+            # size is 1436) - only the audio payload gets copied out
+            packet = memoryview(bytearray(1500))
+            
+            while not self._stop_event.is_set():
                 try:
-                    # VBAN packet structure
-                    data, addr = sock.recvfrom(1436)  # VBAN max packet size
+                    n = sock.recv_into(packet)
                     
-                    if len(data) > 28:  # VBAN header is 28 bytes
-                        # Parse VBAN header
-                        header = data[:28]
-                        audio_data = data[28:]
-                        
-                        # Check if it's valid VBAN packet
-                        if header[:4] == b'VBAN':
-                            # Extract stream name (bytes 8-24)
-                            stream_name = header[8:24].rstrip(b'\x00').decode('utf-8', errors='ignore')
-                            
-                            if stream_name == self.stream_name or self.stream_name == '*':
-                                self.audio_queue.put(audio_data)
+                    # VBAN header is 28 bytes: 'VBAN' magic, then the
+                    # stream name at bytes 8-24
+                    if (n > 28 and packet[:4] == b'VBAN' and
+                            (self._match_any_stream or packet[8:24] == self._expected_name_bytes)):
+                        pending += packet[28:n]
+                        if len(pending) >= self.ENQUEUE_BYTES:
+                            self.audio_queue.put(bytes(pending))
+                            pending.clear()
                                 
                 except socket.timeout:
+                    # Stream paused - don't hold back what we have
+                    if pending:
+                        self.audio_queue.put(bytes(pending))
+                        pending.clear()
                     continue
                 except Exception as e:
                     logger.error(f"VBAN receive error: {e}")
@@ -97,10 +150,11 @@ class VoiceMeeterModule:
                 sock.connect((self.host, self.port))
                 logger.info("Connected to VoiceMeeter TCP stream")
                 
+                # Read audio data
+                # Assuming 16-bit stereo at 48kHz
+                chunk_size = self.ENQUEUE_BYTES
+                
                 while self.running:
-                    # Read audio data
-                    # Assuming 16-bit stereo at 48kHz
-                    chunk_size = 4096
                     data = sock.recv(chunk_size)
                     
                     if not data:
@@ -112,59 +166,81 @@ class VoiceMeeterModule:
                 logger.error(f"TCP connection error: {e}")
                 if self.running:
                     logger.info("Reconnecting in 5 seconds...")
-                    threading.Event().wait(5)
+                    if self._stop_event.wait(5):
+                        break
             finally:
                 sock.close()
     
+    def _ring_write(self, samples):
+        """Copy int16 samples into the ring buffer, dropping the oldest on overflow"""
+        capacity = self._ring.size
+        n = samples.size
+        if n > capacity:
+            samples = samples[-capacity:]
+            self._ring_w += n - capacity
+            n = capacity
+        
+        overflow = self._ring_w + n - self._ring_r - capacity
+        if overflow > 0:
+            # Keep stereo frames aligned when dropping
+            self._ring_r += overflow + (overflow & 1)
+        
+        start = self._ring_w % capacity
+        first = min(n, capacity - start)
+        self._ring[start:start + first] = samples[:first]
+        self._ring[:n - first] = samples[first:]
+        self._ring_w += n
+    
+    def _ring_read(self, n):
+        """Take n samples from the ring buffer (a view unless it wraps)"""
+        capacity = self._ring.size
+        start = self._ring_r % capacity
+        self._ring_r += n
+        if start + n <= capacity:
+            return self._ring[start:start + n]
+        return np.concatenate((self._ring[start:], self._ring[:start + n - capacity]))
+    
     def _process_audio(self):
         """Process captured audio"""
         logger.info("Audio processing thread started")
         
-        # Buffer for accumulating audio
-        audio_buffer = bytearray()
+        # Process in chunks (e.g., 1 second) of interleaved stereo samples
+        chunk_samples = self.sample_rate * 2
+        
+        # Odd trailing byte from a TCP read, completed by the next read
+        carry = b''
         
         while self.running:
             try:
                 audio_data = self.audio_queue.get(timeout=1)
-                audio_buffer.extend(audio_data)
+                if carry:
+                    audio_data = carry + audio_data
+                    carry = b''
+                if len(audio_data) & 1:
+                    carry = audio_data[-1:]
+                    audio_data = audio_data[:-1]
                 
-                # Process in chunks (e.g., 1 second)
-                chunk_size = self.sample_rate * 2 * 2  # 16-bit stereo
+                self._ring_write(np.frombuffer(audio_data, dtype=np.int16))
                 
-                if len(audio_buffer) >= chunk_size:
-                    # Extract chunk
-                    chunk = audio_buffer[:chunk_size]
-                    audio_buffer = audio_buffer[chunk_size:]
+                while self._ring_w - self._ring_r >= chunk_samples:
+                    # Downmix and scale in one pass into the reused buffer
+                    audio_float = self._float_out
+                    _downmix_i16_stereo_to_f32(self._ring_read(chunk_samples), audio_float)
                     
-                    # Convert to numpy array
-                    audio_array = np.frombuffer(chunk, dtype=np.int16)
+                    # Here you would process with VAD and Whisper
+                    # For now, just log
+                    logger.debug(f"Processing audio chunk: {len(audio_float)} samples")
                     
-                    # Convert stereo to mono if needed
-                    if len(audio_array) > 0:
-                        audio_mono = audio_array.reshape(-1, 2).mean(axis=1)
-                        audio_float = audio_mono.astype(np.float32) / 32768.0
-                        
-                        # Here you would process with VAD and Whisper
-                        # For now, just log
-                        logger.debug(f"Processing audio chunk: {len(audio_float)} samples")
-                        
-                        # Simulate transcription for testing
-                        if np.random.random() < 0.1:  # 10% chance
-                            self._simulate_transcription()
+                    # Simulate transcription for testing
+                    if random.random() < 0.1:  # 10% chance
+                        self._simulate_transcription()
                             
             except:
                 continue
     
     def _simulate_transcription(self):
         """Simulate a transcription for testing"""
-        test_phrases = [
-            ("Audio captured from VoiceMeeter", "en"),
-            ("Testing mixed audio stream", "en"),
-            ("All sources are being recorded", "en")
-        ]
-        
-        import random
-        text, lang = random.choice(test_phrases)
+        text, lang = random.choice(self._TEST_PHRASES)
         
         self.ws_server.broadcast_transcription(
             text=text,
@@ -176,6 +252,7 @@ class VoiceMeeterModule:
         """Stop capture"""
         logger.info("Stopping VoiceMeeter capture")
         self.running = False
+        self._stop_event.set()
     
     @staticmethod
     def get_config_fields():
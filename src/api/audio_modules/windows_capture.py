@@ -6,15 +6,26 @@ Fixed Windows audio capture module with improved Whisper handling
 import numpy as np
 import threading
 import time
-from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty, Full
 import logging
-import wave
+import io
+import struct
 import os
+import math
+import re
+from collections import Counter, deque, namedtuple
 from datetime import datetime
+
+# Many differently sized chunks go through the GPU over a session - let the
+# caching allocator grow segments instead of fragmenting (read at first CUDA use)
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
 import torch
+from scipy.signal import resample_poly
 
 # Import translation utilities
 from .translation_utils import TranslationManager
+from .vad_wrapper import get_speech_timestamps_batched
 
 # Import OpenAI Whisper
 try:
@@ -24,9 +35,28 @@ except ImportError as e:
     WHISPER_AVAILABLE = False
     print(f"⚠️ Whisper not available: {e}")
 
+# Import faster-whisper (CTranslate2 backend, preferred when installed)
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+    try:
+        # Batched decoding of 30s windows (faster-whisper 1.1+)
+        from faster_whisper import BatchedInferencePipeline
+    except ImportError:
+        BatchedInferencePipeline = None
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+# Import torchaudio (GPU resampling)
+try:
+    import torchaudio
+    TORCHAUDIO_AVAILABLE = True
+except ImportError:
+    TORCHAUDIO_AVAILABLE = False
+
 # Import Silero VAD
 try:
-    from silero_vad import load_silero_vad, get_speech_timestamps
+    from silero_vad import load_silero_vad
     VAD_AVAILABLE = True
 except ImportError as e:
     VAD_AVAILABLE = False
@@ -34,10 +64,174 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Used by the hallucination check
+_PUNCT_RE = re.compile(r'[.!?;]')
+_SPLIT_RE = re.compile(r'[,\s]+')
+
+# Boilerplate Whisper tends to produce on silence or music
+_HALLUCINATION_PHRASES = (
+    "thank you for watching", "thanks for watching", "thank you so much for watching",
+    "thanks for listening", "thank you for listening", "please subscribe",
+    "don't forget to subscribe", "like and subscribe", "subscribe to my channel",
+    "see you in the next video", "see you next time", "subtitles by",
+    "subtitles made by", "subtitles by the amara.org community", "transcribed by", "transcription by", "captions by",
+    "amara.org", "[music]", "(music)", "[applause]", "[silence]", "[blank_audio]",
+    "bye bye bye", "obrigado por assistir", "inscreva-se no canal", "legendas pela comunidade",
+)
+# Whole phrases only (lookarounds, since some start or end with brackets),
+# longest first so the alternation takes the full match
+_HALLUCINATION_RE = re.compile(r"(?<!\w)(?:%s)(?!\w)" % "|".join(
+    re.escape(p) for p in sorted(_HALLUCINATION_PHRASES, key=len, reverse=True)))
+_NON_WORD_RE = re.compile(r'[\W_]+')
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _audio_stats(audio, silence_level):
+        """Return (max level, RMS level, silent sample count) in one pass"""
+        max_level = 0.0
+        sum_squares = 0.0
+        silence = 0
+        for x in audio:
+            level = abs(x)
+            if level > max_level:
+                max_level = level
+            if level < silence_level:
+                silence += 1
+            sum_squares += x * x
+        return max_level, np.sqrt(sum_squares / max(audio.size, 1)), silence
+else:
+    # Work buffers for _audio_stats, grown as needed (only the audio
+    # processing thread calls it)
+    _stats_scratch = [np.empty(0, dtype=np.float32), np.empty(0, dtype=bool)]
+    
+    def _audio_stats(audio, silence_level):
+        """Return (max level, RMS level, silent sample count)"""
+        n = audio.size
+        if _stats_scratch[0].size < n:
+            _stats_scratch[0] = np.empty(n, dtype=np.float32)
+            _stats_scratch[1] = np.empty(n, dtype=bool)
+        
+        # |x| and the silence mask go into reused buffers; RMS comes from a
+        # dot product, which needs no temporary at all
+        levels = np.abs(audio, out=_stats_scratch[0][:n])
+        silent = np.less(levels, silence_level, out=_stats_scratch[1][:n])
+        return (
+            float(levels.max()),
+            float(np.sqrt(np.dot(audio, audio) / max(n, 1))),
+            int(np.count_nonzero(silent))
+        )
+
+
+# Most buffers one writev() call accepts (1024 on Linux)
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+if _IOV_MAX <= 0:
+    _IOV_MAX = 1024
+
+
+# Queued between audio packets when a client announces a different PCM
+# layout, so packets already queued are still read in the old one
+_InputFormat = namedtuple('_InputFormat', 'channels sample_rate')
+
+class _PCMWaveWriter:
+    """WAV writer that batches PCM writes and patches the header as data lands"""
+    
+    FLUSH_BYTES = 1024 * 1024
+    
+    def __init__(self, path, channels, sample_rate, sample_width=2):
+        self.channels = channels
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self._file = io.FileIO(path, 'wb')  # Unbuffered - we batch ourselves
+        self._pending = []
+        self._pending_bytes = 0
+        self._data_bytes = 0
+        self._file.write(self._header())
+    
+    def _header(self):
+        """44-byte RIFF/WAVE header for the data written so far"""
+        block_align = self.channels * self.sample_width
+        return struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + self._data_bytes, b'WAVE',
+            b'fmt ', 16, 1, self.channels, self.sample_rate,
+            self.sample_rate * block_align, block_align, self.sample_width * 8,
+            b'data', self._data_bytes
+        )
+    
+    def write(self, data):
+        """Queue PCM bytes (any buffer), writing once 1 MiB has built up"""
+        data = memoryview(data).cast('B')
+        self._pending.append(data)
+        self._pending_bytes += data.nbytes
+        if self._pending_bytes >= self.FLUSH_BYTES:
+            self.flush()
+    
+    def flush(self):
+        """Write pending data with gathered writes and update the header"""
+        if not self._pending:
+            return
+        
+        # Detach first so a failed write can't leave the backlog growing
+        pending, pending_bytes = self._pending, self._pending_bytes
+        self._pending = []
+        self._pending_bytes = 0
+        
+        fd = self._file.fileno()
+        if hasattr(os, 'writev'):
+            # Small packets can exceed IOV_MAX buffers per MiB
+            for start in range(0, len(pending), _IOV_MAX):
+                self._writev_all(fd, pending[start:start + _IOV_MAX])
+        else:
+            self._write_all(fd, b''.join(pending))
+        
+        self._data_bytes += pending_bytes
+        
+        # Keep the file playable even if the process dies before close()
+        if hasattr(os, 'pwrite'):
+            os.pwrite(fd, self._header(), 0)
+    
+    @staticmethod
+    def _write_all(fd, data):
+        """os.write until every byte is out"""
+        data = memoryview(data)
+        while data:
+            data = data[os.write(fd, data):]
+    
+    def _writev_all(self, fd, buffers):
+        """os.writev, finishing a short write with plain writes"""
+        written = os.writev(fd, buffers)
+        if written < sum(buf.nbytes for buf in buffers):
+            self._write_all(fd, memoryview(b''.join(buffers))[written:])
+    
+    def close(self):
+        """Flush remaining data, finalize the header and close the file"""
+        self.flush()
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
 
 class WindowsCaptureModule:
     """Windows audio capture module with real-time transcription and translation"""
     
+    # When transcription falls behind, queued chunks are transcribed together:
+    # three 10s chunks fill one 30s Whisper window, and the faster-whisper
+    # batched pipeline decodes several windows at once
+    MAX_BATCH_CHUNKS = 3
+    MAX_BATCH_CHUNKS_BATCHED = 8
+    
+    # Queued audio beyond this is stale for live captions and gets dropped
+    MAX_BACKLOG_SECONDS = 30
+    
     def __init__(self, ws_server, config, audio_queue=None):
         self.ws_server = ws_server
         self.config = config
@@ -48,6 +242,7 @@ class WindowsCaptureModule:
         
         # Windows capture settings
         self.sample_rate = config.get('sample_rate', 48000)
+        self.channels = config.get('channels', 2)  # 1 if the client downmixes before sending
         self.device_name = config.get('device_name', 'Unknown Device')
         
         # Recording settings
@@ -64,6 +259,13 @@ class WindowsCaptureModule:
         # Audio recording files
         self.raw_audio_file = None
         self.processed_audio_file = None
+        self.transcript_file = os.path.join('/app/transcripts', f'transcript_{self.session_id}.txt')
+        
+        # Processed audio and transcripts are handed to the disk writer
+        # thread so file I/O never blocks transcription
+        self._disk_queue = Queue(maxsize=256)
+        self._disk_thread = None
+        self._disk_stop = threading.Event()  # Set once no more writes can be queued
         
         if self.save_audio:
             self._setup_recording_files()
@@ -76,10 +278,28 @@ class WindowsCaptureModule:
         self.segments_processed = 0
         self.failed_transcriptions = 0
         self.hallucination_count = 0
+        self.dropped_seconds = 0.0
+        
+        # Audio processing - 10-second chunks for better context
+        self.chunk_duration = 10.0
+        self.chunk_samples = int(self.sample_rate * self.channels * self.chunk_duration)  # Interleaved int16
         
-        # Audio processing
-        self.audio_buffer = b''
-        self.raw_audio_buffer = []
+        # Incoming int16 samples accumulate here (room for the largest batch
+        # plus one chunk); audio_buffered counts the valid samples at the front
+        self.audio_buffer = np.empty(self.chunk_samples * (self.MAX_BATCH_CHUNKS_BATCHED + 1), dtype=np.int16)
+        self.audio_buffered = 0
+        self.raw_audio_buffer = deque()  # Raw packets waiting for the disk writer
+        self.format_changes = 0  # Bumped each time a client switches the input format
+        
+        # Chunks are transcribed on a single worker so receiving and
+        # buffering the next chunk overlaps with VAD/Whisper on this one
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Transcriber")
+        self._pending_chunk = None  # Future of the chunk being processed
+        
+        # Translation runs off the transcription worker. One thread keeps
+        # broadcasts in transcription order; clients get a single message
+        # per transcription, sent once its translation is in
+        self._translation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="Translator")
         self.last_transcription_time = time.time()
         
         # Whisper specific settings to reduce hallucinations
@@ -87,10 +307,25 @@ class WindowsCaptureModule:
         self.max_silence_ratio = 0.9    # Maximum ratio of silence in audio
         self.hallucination_threshold = 10  # Max repetitions before considering hallucination
         
+        # Cheap spectral speech check run before Silero/Whisper: log energy
+        # in 8 bands between 100Hz and 4kHz (32ms frames at 16kHz), compared
+        # against a per-band noise floor tracked across chunks
+        self.dsp_prefilter = config.get('dsp_prefilter', True)
+        self._dsp_window = np.hanning(512).astype(np.float32)
+        self._dsp_band_edges = np.searchsorted(np.fft.rfftfreq(512, 1 / 16000), np.geomspace(100, 4000, 9))
+        self._noise_floor = None
+        self.dsp_skipped = 0
+        
         # Initialize models
+        self._pinned_audio = None  # Page-locked staging buffer for host-to-GPU copies
+        self._gpu_resampler = None
         self.whisper_model = None
+        self.whisper_backend = None  # 'faster-whisper' or 'openai-whisper'
+        self._batched_whisper = None
         self.vad_model = None
         self._initialize_models()
+        self._resample = self._select_resampler()
+        self.max_batch_chunks = self.MAX_BATCH_CHUNKS_BATCHED if self._batched_whisper else self.MAX_BATCH_CHUNKS
         
         # Initialize translation manager
         self.translation_manager = TranslationManager(preferred_service='auto')
@@ -98,6 +333,31 @@ class WindowsCaptureModule:
         # Log initialization status
         self._log_initialization_status()
     
+    def _select_resampler(self):
+        """Pick the 16kHz resampler for the current input rate"""
+        if self.sample_rate == 16000:
+            return lambda audio: audio
+        if self._gpu_resampler is not None:
+            return self._resample_gpu
+        # Reduce the ratio up front (48kHz -> 1:3) so the polyphase filter
+        # design stays as small as possible
+        g = math.gcd(16000, self.sample_rate)
+        up, down = 16000 // g, self.sample_rate // g
+        return lambda audio: resample_poly(audio, up, down).astype(np.float32, copy=False)
+    
+    def _resample_gpu(self, audio):
+        """Resample with the windowed-sinc kernel kept on the GPU"""
+        with torch.inference_mode():
+            return self._gpu_resampler(torch.from_numpy(audio).cuda()).cpu().numpy()
+    
+    def _build_gpu_resampler(self):
+        """Windowed-sinc resampling kernel for the input rate, kept on the GPU"""
+        if TORCHAUDIO_AVAILABLE and self.sample_rate != 16000:
+            return torchaudio.transforms.Resample(
+                self.sample_rate, 16000, lowpass_filter_width=6, dtype=torch.float32
+            ).cuda()
+        return None
+    
     def _initialize_models(self):
         """Initialize Whisper and VAD models"""
         
@@ -110,25 +370,62 @@ class WindowsCaptureModule:
             logger.info(f"   CUDA version: {torch.version.cuda}")
             logger.info(f"   GPU: {torch.cuda.get_device_name(0)}")
             device = "cuda"
+            
+            # Room for the largest batch of 16kHz mono audio, reused for every VAD pass
+            try:
+                pinned_samples = int(16000 * self.chunk_duration * self.MAX_BATCH_CHUNKS_BATCHED)
+                self._pinned_audio = torch.empty(pinned_samples, dtype=torch.float32, pin_memory=True)
+            except RuntimeError as e:
+                logger.warning(f"⚠️ Could not allocate pinned memory: {e}")
+            
+            self._gpu_resampler = self._build_gpu_resampler()
         else:
             device = "cpu"
             logger.warning("⚠️ CUDA not available - using CPU")
+        self._device = device  # Checked once - the hot path reuses this
         
         # Initialize Whisper
-        if not WHISPER_AVAILABLE:
+        if not WHISPER_AVAILABLE and not FASTER_WHISPER_AVAILABLE:
             logger.error("❌ Whisper not available")
             return
-            
-        try:
-            model_name = os.environ.get('WHISPER_MODEL', 'base')
-            logger.info(f"🔄 Loading Whisper model '{model_name}' on {device}...")
-            
-            self.whisper_model = whisper.load_model(model_name, device=device)
-            logger.info(f"✅ Whisper {model_name} model loaded")
+        
+        model_name = os.environ.get('WHISPER_MODEL', 'base')
+        backend = os.environ.get('WHISPER_BACKEND', 'auto').lower()
+        
+        # faster-whisper runs the same models through CTranslate2 with INT8
+        # weights - several times faster than openai-whisper
+        if FASTER_WHISPER_AVAILABLE and backend in ('auto', 'faster-whisper'):
+            try:
+                compute_type = "int8_float16" if device == "cuda" else "int8"
+                logger.info(f"🔄 Loading faster-whisper model '{model_name}' on {device} ({compute_type})...")
                 
-        except Exception as e:
-            logger.error(f"❌ Failed to load Whisper model: {e}")
-            self.whisper_model = None
+                self.whisper_model = WhisperModel(model_name, device=device, compute_type=compute_type)
+                self.whisper_backend = 'faster-whisper'
+                if BatchedInferencePipeline is not None:
+                    self._batched_whisper = BatchedInferencePipeline(model=self.whisper_model)
+                logger.info(f"✅ faster-whisper {model_name} model loaded")
+                
+            except Exception as e:
+                logger.error(f"❌ Failed to load faster-whisper model: {e}")
+                self.whisper_model = None
+        
+        if self.whisper_model is None and WHISPER_AVAILABLE:
+            try:
+                logger.info(f"🔄 Loading Whisper model '{model_name}' on {device}...")
+                
+                self.whisper_model = whisper.load_model(model_name, device=device)
+                self.whisper_backend = 'openai-whisper'
+                logger.info(f"✅ Whisper {model_name} model loaded")
+                
+                if device == "cuda" and os.environ.get('WHISPER_FP16', 'true').lower() == 'true':
+                    self._half_whisper()
+                
+                if device == "cuda" and os.environ.get('WHISPER_COMPILE', 'false').lower() == 'true':
+                    self._compile_whisper()
+                    
+            except Exception as e:
+                logger.error(f"❌ Failed to load Whisper model: {e}")
+                self.whisper_model = None
         
         # Initialize VAD
         if VAD_AVAILABLE:
@@ -145,22 +442,65 @@ class WindowsCaptureModule:
                 logger.error(f"❌ Failed to load VAD model: {e}")
                 self.vad_model = None
     
+    def _half_whisper(self):
+        """Store openai-whisper weights in fp16 (LayerNorm stays fp32)"""
+        # transcribe(fp16=True) already computes in fp16, but casts the fp32
+        # weights on every layer call. whisper's LayerNorm runs in fp32 and
+        # expects fp32 weights, so it's left alone rather than using .half()
+        try:
+            for module in self.whisper_model.modules():
+                if isinstance(module, torch.nn.LayerNorm):
+                    continue
+                for param in module.parameters(recurse=False):
+                    param.data = param.data.half()
+                for name, buffer in module.named_buffers(recurse=False):
+                    if buffer.is_floating_point():
+                        module._buffers[name] = buffer.half()
+            
+            # Make sure the mixed model actually runs
+            self._run_whisper(np.zeros(16000, dtype=np.float32))
+            logger.info("✅ Whisper weights converted to fp16")
+            
+        except Exception as e:
+            logger.error(f"❌ fp16 weights failed, keeping fp32: {e}")
+            self.whisper_model.float()
+    
+    def _compile_whisper(self):
+        """torch.compile the openai-whisper encoder and decoder (opt-in via WHISPER_COMPILE)"""
+        if not hasattr(torch, 'compile'):
+            logger.warning("⚠️ torch.compile needs PyTorch 2.x - skipping")
+            return
+        
+        try:
+            # Reuse compiled graphs across restarts
+            os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
+            
+            logger.info("🔄 Compiling Whisper encoder/decoder (one-off warmup)...")
+            start_time = time.time()
+            self.whisper_model.encoder = torch.compile(self.whisper_model.encoder, mode="reduce-overhead")
+            self.whisper_model.decoder = torch.compile(self.whisper_model.decoder, mode="reduce-overhead")
+            
+            # Compilation happens on first use - do it now on silence rather
+            # than on the first real chunk
+            self._run_whisper(np.zeros(16000 * 10, dtype=np.float32))
+            logger.info(f"✅ Whisper compiled in {time.time() - start_time:.1f}s")
+            
+        except Exception as e:
+            logger.error(f"❌ torch.compile failed, using eager Whisper: {e}")
+            self.whisper_model.encoder = getattr(self.whisper_model.encoder, '_orig_mod', self.whisper_model.encoder)
+            self.whisper_model.decoder = getattr(self.whisper_model.decoder, '_orig_mod', self.whisper_model.decoder)
+    
     def _setup_recording_files(self):
         """Setup WAV files for recording"""
         try:
             # Raw audio file
             raw_filename = os.path.join(self.recording_dir, f'raw_audio_{self.session_id}.wav')
-            self.raw_audio_file = wave.open(raw_filename, 'wb')
-            self.raw_audio_file.setnchannels(2)
-            self.raw_audio_file.setsampwidth(2)
-            self.raw_audio_file.setframerate(self.sample_rate)
+            self.raw_audio_file = _PCMWaveWriter(raw_filename, channels=self.channels, sample_rate=self.sample_rate)
+            self._raw_audio_parts = 1
             
             # Processed audio file
             proc_filename = os.path.join(self.recording_dir, f'processed_audio_{self.session_id}.wav')
-            self.processed_audio_file = wave.open(proc_filename, 'wb')
-            self.processed_audio_file.setnchannels(1)
-            self.processed_audio_file.setsampwidth(2)
-            self.processed_audio_file.setframerate(16000)
+            self.processed_audio_file = _PCMWaveWriter(proc_filename, channels=1, sample_rate=16000)
             
             logger.info(f"📁 Recording files created")
             
@@ -174,7 +514,7 @@ class WindowsCaptureModule:
         logger.info("🚀 Windows Capture Module Initialized")
         logger.info(f"📅 Session ID: {self.session_id}")
         logger.info(f"🎤 Device: {self.device_name}")
-        logger.info(f"🎯 Whisper: {'Ready' if self.whisper_model else 'Not Available'}")
+        logger.info(f"🎯 Whisper: {f'Ready ({self.whisper_backend})' if self.whisper_model else 'Not Available'}")
         logger.info(f"🔍 VAD: {'Ready' if self.vad_model else 'Not Available'}")
         
         translation_info = self.translation_manager.get_service_info()
@@ -208,121 +548,276 @@ class WindowsCaptureModule:
         monitor_thread.start()
         threads.append(monitor_thread)
         
-        # Recording thread
-        if self.save_audio:
-            recording_thread = threading.Thread(target=self._recording_loop, name="AudioRecorder")
-            recording_thread.start()
-            threads.append(recording_thread)
+        # Disk writer thread (recordings and transcripts)
+        self._disk_thread = threading.Thread(target=self._recording_loop, name="DiskWriter")
+        self._disk_thread.start()
+        threads.append(self._disk_thread)
         
         # Wait for threads
         for thread in threads:
             thread.join()
     
     def _recording_loop(self):
-        """Save raw audio to file periodically"""
-        while self.running:
+        """Write recordings and transcripts queued by the processing thread"""
+        transcript = None
+        
+        while not (self._disk_stop.is_set() and self._disk_queue.empty()):
             try:
-                if self.raw_audio_buffer:
-                    audio_to_save = self.raw_audio_buffer.copy()
-                    self.raw_audio_buffer.clear()
-                    
-                    if self.raw_audio_file:
-                        for chunk in audio_to_save:
-                            self.raw_audio_file.writeframes(chunk)
-                        self.raw_audio_file._file.flush()
+                try:
+                    kind, data = self._disk_queue.get(timeout=1)
+                except Empty:
+                    kind = None
                 
-                time.sleep(1)
+                if kind == 'processed':
+                    if self.processed_audio_file:
+                        self.processed_audio_file.write(data)
+                elif kind == 'transcript':
+                    if transcript is None:
+                        # Opened once and kept open, line buffered
+                        transcript = open(self.transcript_file, 'a', encoding='utf-8', buffering=1)
+                    transcript.write(data)
+                
+                # Raw packets arrive far too often for the queue; collect
+                # whatever has built up since the last pass
+                raw_audio = self.raw_audio_buffer
+                while raw_audio:
+                    chunk = raw_audio.popleft()
+                    if isinstance(chunk, _InputFormat):
+                        self._reopen_raw_audio_file(chunk)
+                    elif self.raw_audio_file:
+                        self.raw_audio_file.write(chunk)
                 
             except Exception as e:
                 logger.error(f"Recording error: {e}")
+        
+        if transcript is not None:
+            transcript.close()
+    
+    def _reopen_raw_audio_file(self, input_format):
+        """Continue the raw recording in a new WAV file with the new format"""
+        try:
+            if self.raw_audio_file:
+                self.raw_audio_file.close()
+            self._raw_audio_parts += 1
+            raw_filename = os.path.join(self.recording_dir,
+                                        f'raw_audio_{self.session_id}_{self._raw_audio_parts}.wav')
+            self.raw_audio_file = _PCMWaveWriter(raw_filename, channels=input_format.channels,
+                                                 sample_rate=input_format.sample_rate)
+            logger.info(f"📁 Raw recording continues in {raw_filename}")
+        except Exception as e:
+            logger.error(f"Failed to reopen raw recording: {e}")
+            self.raw_audio_file = None
+    
+    def set_input_format(self, channels=None, sample_rate=None):
+        """Switch the channel count and/or sample rate the queued PCM is read with
+        
+        Safe to call from the websocket thread: the change is queued behind
+        the audio already received and applied by the processing thread.
+        None keeps the current value.
+        """
+        self.audio_queue.put(_InputFormat(channels, sample_rate))
+    
+    def _apply_input_format(self, input_format):
+        """Start reading the queue in a new format (processing thread)"""
+        input_format = _InputFormat(input_format.channels or self.channels,
+                                    input_format.sample_rate or self.sample_rate)
+        if input_format == (self.channels, self.sample_rate):
+            return
+        
+        # Audio buffered so far is still in the old format - send it on
+        # (or drop it if it's under a second) and let the worker finish
+        # with it before anything reads the new settings
+        samples_per_second = self.sample_rate * self.channels
+        if self.audio_buffered > samples_per_second:
+            self._submit_chunk(self.audio_buffered, self.audio_buffered / samples_per_second)
+        self.audio_buffered = 0
+        if self._pending_chunk is not None:
+            self._pending_chunk.result()
+        
+        logger.info(f"🔄 Input format changed: {self.channels}ch {self.sample_rate}Hz -> "
+                   f"{input_format.channels}ch {input_format.sample_rate}Hz")
+        self.channels = input_format.channels  # _process_chunk downmixes only for 2
+        if input_format.sample_rate != self.sample_rate:
+            self.sample_rate = input_format.sample_rate
+            if self._device == "cuda":
+                self._gpu_resampler = self._build_gpu_resampler()
+            self._resample = self._select_resampler()
+        self.chunk_samples = int(self.sample_rate * self.channels * self.chunk_duration)
+        self.audio_buffer = np.empty(self.chunk_samples * (self.MAX_BATCH_CHUNKS_BATCHED + 1), dtype=np.int16)
+        self.format_changes += 1
+        
+        # The disk writer switches files at the same point in the raw stream
+        if self.save_audio:
+            self.raw_audio_buffer.append(input_format)
+    
+    def _buffer_packet(self, audio_data):
+        """Append one packet from the queue to the sample buffer"""
+        if isinstance(audio_data, _InputFormat):
+            self._apply_input_format(audio_data)
+            return
+        
+        # Ensure it's bytes
+        if not isinstance(audio_data, bytes):
+            return
+        
+        self.total_bytes += len(audio_data)
+        self.total_chunks += 1
+        
+        # Save for recording
+        if self.save_audio:
+            self.raw_audio_buffer.append(audio_data)
+        
+        # Copy the packet straight into the preallocated buffer
+        buffer = self.audio_buffer
+        samples = np.frombuffer(audio_data, dtype=np.int16, count=len(audio_data) // 2)
+        n = samples.size
+        if self.audio_buffered + n > buffer.size:
+            # Never happens while chunks are processed as they fill,
+            # but don't overrun if a single packet is huge
+            samples = samples[-(buffer.size - self.audio_buffered):]
+            n = samples.size
+        buffer[self.audio_buffered:self.audio_buffered + n] = samples
+        self.audio_buffered += n
+    
+    def _drop_stale_backlog(self):
+        """Discard the oldest queued audio once the backlog exceeds MAX_BACKLOG_SECONDS"""
+        if not self.total_chunks:
+            return
+        
+        # Estimate queued seconds from the average packet size seen so far
+        bytes_per_second = self.sample_rate * self.channels * 2  # 16-bit samples
+        packet_seconds = self.total_bytes / self.total_chunks / bytes_per_second
+        queued = self.audio_queue.qsize()
+        if queued * packet_seconds <= self.MAX_BACKLOG_SECONDS:
+            return
+        
+        # Keep the newest chunk's worth so captions resume from "now"
+        keep = int(self.chunk_duration / packet_seconds) + 1
+        dropped_bytes = 0
+        try:
+            for _ in range(queued - keep):
+                audio_data = self.audio_queue.get_nowait()
+                if isinstance(audio_data, _InputFormat):
+                    self._apply_input_format(audio_data)
+                    break  # Stop at the switch - the rest is in the new format
+                if isinstance(audio_data, bytes):
+                    dropped_bytes += len(audio_data)
+                    # Recordings stay complete
+                    if self.save_audio:
+                        self.raw_audio_buffer.append(audio_data)
+        except Empty:
+            pass
+        
+        dropped = dropped_bytes / bytes_per_second
+        self.dropped_seconds += dropped
+        logger.warning(f"⚠️ Transcription fell behind - dropped {dropped:.1f}s of queued audio "
+                      f"({self.dropped_seconds:.1f}s total)")
     
     def _process_audio_realtime(self):
         """Process audio in real-time chunks"""
         logger.info("🎵 Audio processing thread started")
         
-        # Process in 10-second chunks for better context
-        chunk_duration = 10.0
-        bytes_per_second = self.sample_rate * 2 * 2  # 16-bit stereo
-        chunk_size = int(bytes_per_second * chunk_duration)
+        chunk_duration = self.chunk_duration
+        format_changes = None
         
         while self.running:
             try:
-                # Get audio data
-                audio_data = self.audio_queue.get(timeout=0.5)
+                if format_changes != self.format_changes:
+                    # First pass, or a client switched the input format
+                    format_changes = self.format_changes
+                    chunk_samples = self.chunk_samples
+                    samples_per_second = self.sample_rate * self.channels
+                    batch_samples = chunk_samples * self.max_batch_chunks
                 
-                # Ensure it's bytes
-                if isinstance(audio_data, bytes):
-                    self.audio_buffer += audio_data
-                else:
-                    continue
+                self._drop_stale_backlog()
+                
+                # Get audio data
+                self._buffer_packet(self.audio_queue.get(timeout=0.5))
                 
-                self.total_bytes += len(audio_data)
-                self.total_chunks += 1
+                # Pull in whatever is already queued (up to a full batch) so a
+                # backlog gets transcribed together; at light load the queue
+                # is empty and this returns immediately
+                while self.audio_buffered < batch_samples and format_changes == self.format_changes:
+                    try:
+                        self._buffer_packet(self.audio_queue.get_nowait())
+                    except Empty:
+                        break
                 
-                # Save for recording
-                if self.save_audio:
-                    self.raw_audio_buffer.append(audio_data)
+                if format_changes != self.format_changes:
+                    continue  # Re-derive the sizes before looking at the buffer
                 
                 # Process when we have enough audio
-                if len(self.audio_buffer) >= chunk_size:
-                    chunk = self.audio_buffer[:chunk_size]
-                    self.audio_buffer = self.audio_buffer[chunk_size:]
-                    self._process_chunk(chunk, chunk_duration)
+                if self.audio_buffered >= chunk_samples:
+                    if self._pending_chunk is not None and not self._pending_chunk.done():
+                        # Worker busy - keep buffering until a full batch is waiting
+                        if self.audio_buffered < batch_samples:
+                            continue
+                        self._pending_chunk.result()
+                    
+                    chunks = min(self.audio_buffered // chunk_samples, self.max_batch_chunks)
+                    self._submit_chunk(chunks * chunk_samples, chunks * chunk_duration)
                     
             except Empty:
                 # Process remaining buffer if significant
-                if len(self.audio_buffer) > self.sample_rate * 4:  # At least 2 seconds
-                    remaining_duration = len(self.audio_buffer) / bytes_per_second
-                    chunk = self.audio_buffer
-                    self.audio_buffer = b''
-                    self._process_chunk(chunk, remaining_duration)
+                if self.audio_buffered > samples_per_second:  # At least 1 second
+                    remaining_duration = self.audio_buffered / samples_per_second
+                    self._submit_chunk(self.audio_buffered, remaining_duration)
                     
             except Exception as e:
                 logger.error(f"❌ Error in audio processing: {e}")
                 import traceback
                 traceback.print_exc()
     
-    def _process_chunk(self, audio_bytes, duration):
-        """Process a chunk of audio"""
+    def _submit_chunk(self, size, duration):
+        """Hand the first size buffered samples to the transcription worker"""
+        buffer = self.audio_buffer
+        # The worker gets its own copy - the buffer keeps filling meanwhile
+        chunk = buffer[:size].copy()
+        
+        # Shift the leftover samples to the front
+        leftover = self.audio_buffered - size
+        buffer[:leftover] = buffer[size:self.audio_buffered]
+        self.audio_buffered = leftover
+        
+        self._pending_chunk = self._executor.submit(self._process_chunk, chunk, duration)
+    
+    def _process_chunk(self, audio_array, duration):
+        """Process a chunk of int16 audio samples"""
         try:
             self.segments_processed += 1
             
-            # Convert to numpy array
-            audio_array = np.frombuffer(audio_bytes, dtype=np.int16)
-            
-            # Convert stereo to mono
-            if len(audio_array) % 2 == 0:
+            # Convert stereo to mono float32 (no float64 temporary from mean())
+            if self.channels == 2 and len(audio_array) % 2 == 0:
                 audio_stereo = audio_array.reshape(-1, 2)
-                audio_mono = audio_stereo.mean(axis=1).astype(np.int16)
+                audio_float = audio_stereo[:, 0].astype(np.float32)
+                audio_float += audio_stereo[:, 1]
+                audio_float *= 0.5 / 32768.0
             else:
-                audio_mono = audio_array
+                audio_float = audio_array.astype(np.float32)
+                audio_float *= 1.0 / 32768.0
             
-            # Convert to float32
-            audio_float = audio_mono.astype(np.float32) / 32768.0
-            
-            # Resample to 16kHz for Whisper
-            if self.sample_rate != 16000:
-                downsample_factor = self.sample_rate / 16000
-                indices = np.arange(0, len(audio_float), downsample_factor).astype(int)
-                indices = indices[indices < len(audio_float)]
-                audio_float = audio_float[indices]
+            # Resample to 16kHz for Whisper (resampler re-picked on format changes)
+            audio_float = self._resample(audio_float)
             
             # Save processed audio
             if self.save_audio and self.processed_audio_file:
-                processed_int16 = (audio_float * 32767).astype(np.int16)
-                self.processed_audio_file.writeframes(processed_int16.tobytes())
-                self.processed_audio_file._file.flush()
+                # Scale straight into the int16 output - no float temporary
+                processed_int16 = np.empty(len(audio_float), dtype=np.int16)
+                np.multiply(audio_float, 32767, out=processed_int16, casting='unsafe')
+                try:
+                    self._disk_queue.put_nowait(('processed', processed_int16))
+                except Full:
+                    # Disk can't keep up - the recording is expendable
+                    logger.debug("Disk queue full, dropping processed audio")
             
             # Calculate audio levels
-            max_level = np.max(np.abs(audio_float))
-            rms_level = np.sqrt(np.mean(audio_float**2))
+            max_level, rms_level, silence_samples = _audio_stats(audio_float, 0.01)
             
             # Skip if too quiet
             if max_level < 0.001:
                 return
             
             # Check silence ratio
-            silence_samples = np.sum(np.abs(audio_float) < 0.01)
             silence_ratio = silence_samples / len(audio_float)
             
             if silence_ratio > self.max_silence_ratio:
@@ -335,6 +830,12 @@ class WindowsCaptureModule:
                           f"Max: {max_level:.3f}, RMS: {rms_level:.3f}, "
                           f"Silence: {silence_ratio:.1%}")
             
+            # Skip chunks with nothing standing out above the noise floor
+            if self.dsp_prefilter and not self._dsp_vad(audio_float):
+                self.dsp_skipped += 1
+                logger.debug("No speech energy above noise floor, skipping")
+                return
+            
             # Process with VAD if available
             if self.vad_model and VAD_AVAILABLE:
                 self._transcribe_with_vad(audio_float, duration)
@@ -347,23 +848,56 @@ class WindowsCaptureModule:
             import traceback
             traceback.print_exc()
     
+    def _dsp_vad(self, audio_float):
+        """Rough speech check: enough frames well above the band noise floor?"""
+        n_frames = len(audio_float) // 512
+        if n_frames < 8:
+            return True
+        
+        frames = audio_float[:n_frames * 512].reshape(n_frames, 512) * self._dsp_window
+        spectrum = np.fft.rfft(frames, axis=1)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        
+        edges = self._dsp_band_edges
+        bands = np.log(np.add.reduceat(power[:, :edges[-1]], edges[:-1], axis=1) + 1e-10)
+        
+        # The quietest frames of the chunk approximate its noise; the floor
+        # follows drops immediately and rises slowly
+        quiet = np.percentile(bands, 10, axis=0)
+        if self._noise_floor is None:
+            self._noise_floor = quiet
+        else:
+            self._noise_floor = np.minimum(quiet, self._noise_floor + 0.1 * (quiet - self._noise_floor))
+        
+        # Speech frames sit ~6dB (ln 4) above the floor on average across
+        # bands; require about a quarter second of them
+        loud_frames = np.count_nonzero((bands - self._noise_floor).mean(axis=1) > 1.4)
+        return loud_frames >= 8
+    
     def _transcribe_with_vad(self, audio_float, duration):
         """Transcribe using VAD to detect speech segments"""
         try:
-            device = 'cuda' if torch.cuda.is_available() else 'cpu'
-            audio_tensor = torch.tensor(audio_float, dtype=torch.float32)
+            # Shares memory with audio_float - no copy on CPU
+            audio_tensor = torch.from_numpy(audio_float)
             
-            if device == 'cuda':
-                audio_tensor = audio_tensor.cuda()
+            if self._device == 'cuda':
+                n = audio_tensor.numel()
+                if self._pinned_audio is not None and n <= self._pinned_audio.numel():
+                    # DMA from page-locked memory without a pageable bounce copy
+                    staging = self._pinned_audio[:n]
+                    staging.copy_(audio_tensor)
+                    audio_tensor = staging.to('cuda', non_blocking=True)
+                else:
+                    audio_tensor = audio_tensor.cuda()
             
-            # Get speech timestamps with adjusted parameters
-            speech_timestamps = get_speech_timestamps(
+            # Get speech timestamps with adjusted parameters, scoring all
+            # VAD windows in one batched model call
+            speech_timestamps = get_speech_timestamps_batched(
                 audio_tensor,
                 self.vad_model,
                 threshold=0.5,
                 min_speech_duration_ms=500,  # Increased from 250ms
-                min_silence_duration_ms=500,  # Increased from 300ms
-                return_seconds=False
+                min_silence_duration_ms=500  # Increased from 300ms
             )
             
             if not speech_timestamps:
@@ -375,7 +909,9 @@ class WindowsCaptureModule:
             speech_segments = []
             total_speech_duration = 0
             
-            audio_cpu = audio_float if device == 'cpu' else audio_tensor.cpu().numpy()
+            # Segments are cut from the host copy - the GPU tensor holds the
+            # same samples, so there's nothing to copy back
+            audio_cpu = audio_float
             
             for i, ts in enumerate(speech_timestamps):
                 start_sample = ts['start']
@@ -405,60 +941,109 @@ class WindowsCaptureModule:
         if not text or len(text) < 10:
             return False
         
-        # Clean and split text
+        # Known boilerplate phrases - only when they make up essentially the
+        # whole text (80% of its letters), so speech that happens to contain
+        # "subscribe to my channel" is kept
+        lowered = text.lower()
+        matches = _HALLUCINATION_RE.findall(lowered)
+        if matches:
+            covered = sum(len(_NON_WORD_RE.sub('', m)) for m in matches)
+            if covered >= 0.8 * len(_NON_WORD_RE.sub('', lowered)):
+                self.hallucination_count += 1
+                logger.warning(f"⚠️ Detected hallucination (phrase '{matches[0]}'): {text[:100]}...")
+                return True
+        
         # Remove punctuation and split by both spaces and commas
-        import re
-        cleaned = re.sub(r'[.!?;]', '', text)
-        # Split by comma or space
-        words = re.split(r'[,\s]+', cleaned)
-        words = [w.strip().lower() for w in words if w.strip()]
+        words = [w.lower() for w in _SPLIT_RE.split(_PUNCT_RE.sub('', text)) if w]
+        n = len(words)
         
-        if len(words) < 3:
+        if n < 3:
             return False
         
-        # Check for repeated n-grams
-        # 1-gram (single word repetition)
-        for i in range(len(words) - 2):
+        # Check for back-to-back repeated 1-, 2- and 3-grams in a single pass
+        for i in range(n - 2):
             if words[i] == words[i+1] == words[i+2]:
-                self.hallucination_count += 1
-                logger.warning(f"⚠️ Detected hallucination (repeated word '{words[i]}'): {text[:100]}...")
-                return True
-        
-        # 2-gram (bigram repetition)
-        if len(words) >= 4:
-            for i in range(len(words) - 3):
-                bigram1 = (words[i], words[i+1])
-                bigram2 = (words[i+2], words[i+3])
-                if bigram1 == bigram2:
-                    self.hallucination_count += 1
-                    logger.warning(f"⚠️ Detected hallucination (repeated bigram '{' '.join(bigram1)}'): {text[:100]}...")
-                    return True
-        
-        # 3-gram (trigram repetition)
-        if len(words) >= 6:
-            for i in range(len(words) - 5):
-                trigram1 = (words[i], words[i+1], words[i+2])
-                trigram2 = (words[i+3], words[i+4], words[i+5])
-                if trigram1 == trigram2:
-                    self.hallucination_count += 1
-                    logger.warning(f"⚠️ Detected hallucination (repeated trigram '{' '.join(trigram1)}'): {text[:100]}...")
-                    return True
+                reason = f"repeated word '{words[i]}'"
+            elif i + 3 < n and words[i:i+2] == words[i+2:i+4]:
+                reason = f"repeated bigram '{' '.join(words[i:i+2])}'"
+            elif i + 5 < n and words[i:i+3] == words[i+3:i+6]:
+                reason = f"repeated trigram '{' '.join(words[i:i+3])}'"
+            else:
+                continue
+            self.hallucination_count += 1
+            logger.warning(f"⚠️ Detected hallucination ({reason}): {text[:100]}...")
+            return True
         
         # Check if more than 50% of the text is the same word
-        if words:
-            word_counts = {}
-            for word in words:
-                word_counts[word] = word_counts.get(word, 0) + 1
-            
-            max_count = max(word_counts.values())
-            if max_count > len(words) * 0.5 and len(words) > 4:
-                most_common = [w for w, c in word_counts.items() if c == max_count][0]
-                self.hallucination_count += 1
-                logger.warning(f"⚠️ Detected hallucination (>{50}% same word '{most_common}'): {text[:100]}...")
-                return True
+        most_common, max_count = Counter(words).most_common(1)[0]
+        if max_count > n * 0.5 and n > 4:
+            self.hallucination_count += 1
+            logger.warning(f"⚠️ Detected hallucination (>{50}% same word '{most_common}'): {text[:100]}...")
+            return True
         
         return False
     
+    def _run_whisper(self, audio_float):
+        """Run the loaded Whisper backend and return an openai-whisper style result dict"""
+        if self._batched_whisper is not None and len(audio_float) > 16000 * 30:
+            # Decode the 30s windows of a backlog batch in parallel
+            window = 16000 * 30
+            segments, info = self._batched_whisper.transcribe(
+                audio_float,
+                language=None,  # Auto-detect
+                task="transcribe",
+                temperature=0.0,  # Deterministic
+                beam_size=1,  # Disable beam search
+                no_speech_threshold=0.6,
+                log_prob_threshold=-1.0,
+                compression_ratio_threshold=2.4,
+                vad_filter=False,  # Silero VAD already ran
+                clip_timestamps=[
+                    {"start": start, "end": min(start + window, len(audio_float))}
+                    for start in range(0, len(audio_float), window)
+                ],
+                batch_size=self.MAX_BATCH_CHUNKS_BATCHED
+            )
+        elif self.whisper_backend == 'faster-whisper':
+            segments, info = self.whisper_model.transcribe(
+                audio_float,
+                language=None,  # Auto-detect
+                task="transcribe",
+                temperature=0.0,  # Deterministic
+                best_of=1,  # Disable beam search
+                beam_size=1,  # Disable beam search
+                no_speech_threshold=0.6,
+                log_prob_threshold=-1.0,
+                compression_ratio_threshold=2.4,
+                condition_on_previous_text=False,  # Prevent context contamination
+                initial_prompt=None,  # Don't provide initial prompt
+                vad_filter=False  # Silero VAD already ran
+            )
+        
+        if self.whisper_backend == 'faster-whisper':
+            # Segments are generated lazily - decoding happens here
+            segments = list(segments)
+            return {
+                "text": "".join(segment.text for segment in segments),
+                "language": info.language,
+                "no_speech_prob": max((segment.no_speech_prob for segment in segments), default=0)
+            }
+        
+        return self.whisper_model.transcribe(
+            audio_float,
+            language=None,  # Auto-detect
+            task="transcribe",
+            temperature=0.0,  # Deterministic
+            best_of=1,  # Disable beam search
+            beam_size=1,  # Disable beam search
+            no_speech_threshold=0.6,
+            logprob_threshold=-1.0,
+            compression_ratio_threshold=2.4,
+            condition_on_previous_text=False,  # Prevent context contamination
+            initial_prompt=None,  # Don't provide initial prompt
+            fp16=self.whisper_model.device.type == 'cuda'
+        )
+    
     def _transcribe_audio(self, audio_float, duration):
         """Transcribe audio using Whisper with hallucination detection"""
         try:
@@ -477,19 +1062,7 @@ class WindowsCaptureModule:
             
             # Transcribe with adjusted parameters
             start_time = time.time()
-            result = self.whisper_model.transcribe(
-                audio_float,
-                language=None,  # Auto-detect
-                task="transcribe",
-                temperature=0.0,  # Deterministic
-                best_of=1,  # Disable beam search
-                beam_size=1,  # Disable beam search
-                no_speech_threshold=0.6,
-                logprob_threshold=-1.0,
-                compression_ratio_threshold=2.4,
-                condition_on_previous_text=False,  # Prevent context contamination
-                initial_prompt=None  # Don't provide initial prompt
-            )
+            result = self._run_whisper(audio_float)
             transcription_time = time.time() - start_time
             
             # Extract results
@@ -514,7 +1087,7 @@ class WindowsCaptureModule:
             
             # Successful transcription!
             self.transcription_count += 1
-            timestamp = datetime.now()
+            timestamp = time.time()
             
             logger.info("=" * 60)
             logger.info(f"✅ Transcription #{self.transcription_count}")
@@ -523,8 +1096,24 @@ class WindowsCaptureModule:
             logger.info(f"🌐 Language: {language}")
             logger.info(f"📝 Text: {text}")
             
-            # Translation
-            translation = None
+            logger.info("=" * 60)
+            
+            # Translate, broadcast and save on the translation worker so the
+            # next chunk can start transcribing right away
+            self._translation_executor.submit(self._translate_and_publish, text, language, timestamp)
+            self.last_transcription_time = timestamp
+                
+        except Exception as e:
+            self.failed_transcriptions += 1
+            logger.error(f"❌ Transcription error: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    def _translate_and_publish(self, text, language, timestamp):
+        """Translate a transcription, then broadcast and save it"""
+        # Translation
+        translation = None
+        try:
             if self.translation_manager.translator:
                 if language == 'en':
                     translation = self.translation_manager.translate(text, source_lang='en', target_lang='pt')
@@ -538,38 +1127,31 @@ class WindowsCaptureModule:
                     translation = self.translation_manager.translate(text, source_lang=language, target_lang='en')
                     if translation:
                         logger.info(f"🇬🇧 English: {translation}")
-            
-            logger.info("=" * 60)
-            
-            # Broadcast to WebSocket
-            self.ws_server.broadcast_transcription(
-                text=text,
-                lang=language,
-                translation=translation
-            )
-            
-            # Save transcript
-            self._save_transcript(text, language, translation, timestamp)
-            self.last_transcription_time = time.time()
-                
         except Exception as e:
-            self.failed_transcriptions += 1
-            logger.error(f"❌ Transcription error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"❌ Translation error: {e}")
+        
+        # Broadcast to WebSocket
+        self.ws_server.broadcast_transcription(
+            text=text,
+            lang=language,
+            translation=translation
+        )
+        
+        # Save transcript
+        self._save_transcript(text, language, translation, timestamp)
     
     def _save_transcript(self, text, language, translation, timestamp):
         """Save transcript to file"""
         try:
-            transcript_file = os.path.join('/app/transcripts', f'transcript_{self.session_id}.txt')
-            
-            with open(transcript_file, 'a', encoding='utf-8') as f:
-                f.write(f"\n[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}]\n")
-                f.write(f"Language: {language}\n")
-                f.write(f"Original: {text}\n")
-                if translation:
-                    f.write(f"Translation: {translation}\n")
-                f.write("-" * 60 + "\n")
+            entry = (f"\n[{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))}]\n"
+                     f"Language: {language}\n"
+                     f"Original: {text}\n")
+            if translation:
+                entry += f"Translation: {translation}\n"
+            entry += "-" * 60 + "\n"
+            
+            # Transcripts are never dropped - wait for room if needed
+            self._disk_queue.put(('transcript', entry))
                 
         except Exception as e:
             logger.error(f"Error saving transcript: {e}")
@@ -590,6 +1172,8 @@ class WindowsCaptureModule:
 Audio: {self.total_chunks:,} chunks, {self.total_bytes/1024/1024:.1f} MB
 Transcriptions: {self.transcription_count} successful, {self.failed_transcriptions} failed ({success_rate:.1f}% success)
 Hallucinations detected: {self.hallucination_count}
+Dropped backlog: {self.dropped_seconds:.1f}s
+Skipped by DSP prefilter: {self.dsp_skipped} chunks
 Queue: {self.audio_queue.qsize()} items
 """)
                     
@@ -603,7 +1187,18 @@ Queue: {self.audio_queue.qsize()} items
         logger.info("🛑 Stopping Windows capture module...")
         self.running = False
         
-        time.sleep(1)
+        # Finish the chunk being transcribed, drop any not yet started, then
+        # publish the translations already queued
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._translation_executor.shutdown(wait=True)
+        self.translation_manager.close()
+        
+        # Let the disk writer drain its queue before the files are closed
+        self._disk_stop.set()
+        if self._disk_thread is not None:
+            self._disk_thread.join(timeout=5)
+        else:
+            time.sleep(1)
         
         # Close recording files
         if self.save_audio:
@@ -0,0 +1,59 @@
+# api-server/audio_queue.py
+import threading
+import time
+from collections import deque
+from queue import Empty
+
+
+class ChunkQueue:
+    """Single-producer/single-consumer hand-off for audio chunks
+
+    A deque plus an Event instead of queue.Queue's lock and conditions.
+    Implements the part of the Queue API the audio modules use (put,
+    get, get_nowait, qsize, empty) and raises queue.Empty the same way.
+    """
+
+    def __init__(self, maxlen=None):
+        self._items = deque(maxlen=maxlen)
+        self._ready = threading.Event()
+        self._pop_lock = threading.Lock()
+
+    def put(self, item, block=True, timeout=None):
+        self._items.append(item)
+        self._ready.set()
+
+    def put_nowait(self, item):
+        self.put(item)
+
+    def get_nowait(self):
+        with self._pop_lock:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+            self._ready.clear()
+            # A put may have landed between the failed pop and the clear
+            if self._items:
+                self._ready.set()
+                return self._items.popleft()
+        raise Empty
+
+    def get(self, block=True, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.get_nowait()
+            except Empty:
+                if not block:
+                    raise
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise Empty
+            self._ready.wait(remaining)
+
+    def qsize(self):
+        return len(self._items)
+
+    def empty(self):
+        return not self._items
@@ -1,5 +1,5 @@
 # api-server/main.py
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 import logging
 import threading
@@ -7,12 +7,13 @@ import time
 import importlib
 import os
 import asyncio
+import struct
 import websockets
-import json
-from queue import Queue
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 
 # Import WebSocket server
-from websocket_server import get_websocket_server
+from websocket_server import get_websocket_server, json_dumps, json_loads
+from audio_queue import ChunkQueue
 
 app = Flask(__name__)
 # Allow all origins for development
@@ -25,22 +26,122 @@ logger = logging.getLogger(__name__)
 ws_server = get_websocket_server()
 
 # Windows audio capture WebSocket server
-windows_audio_clients = set()
-windows_audio_queue = Queue()
+# Touched from the event loop and from Flask threads - mutate under the
+# lock and iterate over snapshots
+windows_audio_clients = []
+_clients_lock = threading.Lock()
+windows_audio_ready = threading.Event()  # Set once port 8766 is listening
+windows_audio_queue = ChunkQueue()  # Backlog trimming is left to the audio module
 
-# Global variable to track device requests
+# Small audio frames are merged before queueing - flush at this size or
+# after this long, whichever comes first
+AUDIO_COALESCE_BYTES = 32768
+AUDIO_COALESCE_SECONDS = 0.02
+
+# Clients announcing 'framing': 'batched' pack several chunks per frame,
+# each prefixed with <device index, payload length>
+BATCH_HEADER = struct.Struct('<HI')
+
+def split_batched_frame(frame):
+    """Yield (device_index, payload) pairs from a batched audio frame"""
+    view = memoryview(frame)
+    offset = 0
+    while offset + BATCH_HEADER.size <= len(view):
+        device_index, length = BATCH_HEADER.unpack_from(view, offset)
+        offset += BATCH_HEADER.size
+        yield device_index, view[offset:offset + length]
+        offset += length
+
+def add_windows_client(websocket):
+    with _clients_lock:
+        windows_audio_clients.append(websocket)
+
+def remove_windows_client(websocket):
+    with _clients_lock:
+        if websocket in windows_audio_clients:
+            windows_audio_clients.remove(websocket)
+
+def windows_clients_snapshot():
+    """Copy of the connected Windows clients, safe to iterate from any thread"""
+    with _clients_lock:
+        return list(windows_audio_clients)
+
+# Pending device requests: request_id -> Future resolved by the client's reply
 device_requests = {}
 
+# PCM format last announced by a Windows audio client (channels, sample_rate)
+client_audio_format = {}
+
+def send_to_windows_client(client, command, timeout=1.0):
+    """Send a command to a Windows client from a Flask thread
+    
+    The clients live on the WebSocket server's event loop, so the send is
+    handed to that loop instead of spinning up a new loop per call.
+    """
+    future = asyncio.run_coroutine_threadsafe(client.send(command), ws_server.loop)
+    future.result(timeout=timeout)
+
+def wait_for_device_request(future, request_id, timeout):
+    """Wait for the client's answer to a device request, or None on timeout
+    
+    Takes the Future itself: the WebSocket handler pops it from
+    device_requests as soon as a reply arrives, which can be before we wait.
+    """
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        return None
+    finally:
+        device_requests.pop(request_id, None)
+
+def apply_client_audio_format(client_id, info):
+    """Make the capture module read a client's stream with its advertised channels and sample rate
+    
+    The module interprets the raw stream with its own format, so a mismatch
+    garbles the audio without any other error. Returns False if the format
+    can't be used, in which case the client has to be turned away.
+    """
+    advertised = {key: info[key] for key in ('channels', 'sample_rate') if info.get(key) is not None}
+    if not advertised:
+        return True
+    if advertised.get('channels', 1) not in (1, 2):
+        logger.warning(f"⚠️ Client {client_id} sends unsupported channels={advertised['channels']}")
+        return False
+    sample_rate = advertised.get('sample_rate', 16000)
+    if not isinstance(sample_rate, int) or not 8000 <= sample_rate <= 192000:
+        logger.warning(f"⚠️ Client {client_id} sends unsupported sample_rate={sample_rate}")
+        return False
+    
+    # A module started later picks this up as its default
+    client_audio_format.update(advertised)
+    
+    module = audio_manager if getattr(audio_manager, 'audio_queue', None) is windows_audio_queue else None
+    if hasattr(module, 'set_input_format'):
+        # Queued behind the client's audio; a no-op if nothing changes
+        module.set_input_format(**advertised)
+        return True
+    for key, value in advertised.items():
+        if getattr(module, key, value) != value:
+            logger.warning(f"⚠️ Client {client_id} sends {key}={value} but the audio module "
+                           f"expects {getattr(module, key)} and can't switch")
+            return False
+    return True
+
 def auto_start_audio_module():
     """Auto-start audio module if configured"""
-    import time
-    time.sleep(5)  # Wait for everything to initialize
+    # Wait for both WebSocket servers instead of a fixed delay
+    for name, ready in (("WebSocket", ws_server.ready), ("Windows audio", windows_audio_ready)):
+        if not ready.wait(timeout=5):
+            logger.warning(f"{name} server not ready - auto-starting anyway")
     
     auto_module = os.environ.get('AUTO_START_MODULE', '')
     if auto_module:
         logger.info(f"🚀 Auto-starting audio module: {auto_module}")
         config = {
-            'save_audio': os.environ.get('SAVE_AUDIO', 'true').lower() == 'true'
+            'save_audio': os.environ.get('SAVE_AUDIO', 'true').lower() == 'true',
+            'channels': int(os.environ.get('AUDIO_CHANNELS', '2')),
+            'sample_rate': int(os.environ.get('AUDIO_SAMPLE_RATE', '48000')),
+            **client_audio_format
         }
         
         try:
@@ -64,15 +165,29 @@ async def handle_windows_audio(websocket, path):
     """Handle incoming audio from Windows client with device management"""
     client_id = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}" if websocket.remote_address else "unknown"
     logger.info(f"🎤 Windows audio client connected from {client_id}")
-    windows_audio_clients.add(websocket)
+    add_windows_client(websocket)
     
     bytes_received = 0
     chunks_received = 0
-    last_log_time = time.time()
+    last_log_time = time.monotonic()
+    
+    loop = asyncio.get_running_loop()
+    pending_audio = bytearray()
+    flush_handle = None
+    batched_framing = False
+    
+    def flush_audio():
+        nonlocal flush_handle
+        if flush_handle is not None:
+            flush_handle.cancel()
+            flush_handle = None
+        if pending_audio:
+            windows_audio_queue.put(bytes(pending_audio))
+            pending_audio.clear()
     
     try:
         # Send connection confirmation
-        await websocket.send(json.dumps({
+        await websocket.send(json_dumps({
             "type": "connection",
             "status": "connected",
             "message": "Connected to Windows audio server"
@@ -80,41 +195,62 @@ async def handle_windows_audio(websocket, path):
         
         async for message in websocket:
             if isinstance(message, bytes):
-                # Raw audio data
-                windows_audio_queue.put(message)
+                # Raw audio data - frames that are already big enough are
+                # handed over as-is, without copying through pending_audio
+                if not batched_framing and not pending_audio and len(message) >= AUDIO_COALESCE_BYTES:
+                    windows_audio_queue.put(message)
+                else:
+                    if batched_framing:
+                        for _, payload in split_batched_frame(message):
+                            pending_audio.extend(payload)
+                    else:
+                        pending_audio.extend(message)
+                    if len(pending_audio) >= AUDIO_COALESCE_BYTES:
+                        flush_audio()
+                    elif flush_handle is None:
+                        flush_handle = loop.call_later(AUDIO_COALESCE_SECONDS, flush_audio)
                 bytes_received += len(message)
                 chunks_received += 1
                 
-                # Log progress every 5 seconds
-                if time.time() - last_log_time > 5:
-                    logger.info(f"📊 Windows audio stats - Client: {client_id}, Chunks: {chunks_received}, Bytes: {bytes_received:,}")
-                    last_log_time = time.time()
+                # Log progress every 5 seconds - only look at the clock
+                # every 64 frames
+                if (chunks_received & 63) == 0 and time.monotonic() - last_log_time > 5:
+                    logger.info("📊 Windows audio stats - Client: %s, Chunks: %d, Bytes: %d",
+                                client_id, chunks_received, bytes_received)
+                    last_log_time = time.monotonic()
                     
             else:
                 # JSON control message
                 try:
-                    data = json.loads(message)
+                    data = json_loads(message)
                     msg_type = data.get('type')
                     
                     # Handle device list response
                     if msg_type == 'device_list':
                         request_id = data.get('request_id')
-                        if request_id in device_requests:
-                            device_requests[request_id]['result'] = {
+                        # First reply wins if several clients answer
+                        future = device_requests.pop(request_id, None)
+                        if future is not None:
+                            future.set_result({
                                 'devices': data.get('devices', [])
-                            }
-                            device_requests[request_id]['completed'] = True
+                            })
                     
                     # Handle device test response
                     elif msg_type == 'device_test':
                         request_id = data.get('request_id')
-                        if request_id in device_requests:
-                            device_requests[request_id]['result'] = data.get('result', {})
-                            device_requests[request_id]['completed'] = True
+                        future = device_requests.pop(request_id, None)
+                        if future is not None:
+                            future.set_result(data.get('result', {}))
                     
                     # Handle client info
-                    elif msg_type == 'info':
+                    elif msg_type in ('info', 'client_info'):
+                        batched_framing = data.get('framing') == 'batched'
                         logger.info(f"Client info: Mode: {data.get('mode')}, Client: {data.get('client')}")
+                        # Audio received so far goes out in the old format
+                        flush_audio()
+                        if not apply_client_audio_format(client_id, data):
+                            await websocket.close(1003, "Unsupported audio format")
+                            break
                     
                     else:
                         logger.info(f"📨 Control message from {client_id}: {data}")
@@ -127,46 +263,65 @@ async def handle_windows_audio(websocket, path):
     except Exception as e:
         logger.error(f"❌ Error in Windows audio handler: {e}")
     finally:
-        windows_audio_clients.discard(websocket)
+        flush_audio()
+        remove_windows_client(websocket)
         logger.info(f"🔌 Active Windows clients: {len(windows_audio_clients)}")
 
 def start_windows_audio_server():
-    """Start the Windows audio WebSocket server"""
-    async def start_server():
-        try:
-            server = await websockets.serve(
-                handle_windows_audio, 
-                '0.0.0.0', 
-                8766,
-                compression=None,
-                max_size=10485760
-            )
-            logger.info("🎧 Windows audio WebSocket server listening on port 8766")
-            await asyncio.Future()  # Run forever
-        except Exception as e:
-            logger.error(f"Failed to start Windows audio server: {e}")
-    
-    # Create new event loop for this thread
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    """Start the Windows audio WebSocket server on the shared event loop"""
     try:
-        loop.run_until_complete(start_server())
+        ws_server.serve(
+            handle_windows_audio,
+            '0.0.0.0',
+            8766,
+            compression=None,
+            # Audio frames are a few KiB - 1 MiB leaves room for large
+            # client buffer sizes, and a short queue pushes back on the
+            # client when processing stalls
+            max_size=1024 * 1024,
+            max_queue=16
+        )
+        logger.info("🎧 Windows audio WebSocket server listening on port 8766")
+        windows_audio_ready.set()
     except Exception as e:
-        logger.error(f"Windows audio server error: {e}")
-    finally:
-        loop.close()
+        logger.error(f"Failed to start Windows audio server: {e}")
 
 # Audio module manager
 audio_manager = None
 current_audio_thread = None
 
-@app.route('/health')
-def health():
-    return jsonify({
+def health_payload():
+    return {
         "status": "healthy",
         "websocket": "running" if ws_server and ws_server.running else "stopped",
         "windows_audio_clients": len(windows_audio_clients)
-    })
+    }
+
+@app.route('/health')
+def health():
+    return jsonify(health_payload())
+
+class FastHealth:
+    """WSGI middleware answering GET /health before Flask dispatches it
+    
+    Liveness probes hit this often; skipping request/routing setup keeps
+    them cheap. Everything else goes to the wrapped app.
+    """
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == '/health' and environ.get('REQUEST_METHOD') == 'GET':
+            body = json_dumps(health_payload()).encode()
+            start_response('200 OK', [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(body)))
+            ])
+            return [body]
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = FastHealth(app.wsgi_app)
 
 @app.route('/api/status')
 def status():
@@ -177,98 +332,109 @@ def status():
         "windows_audio_clients": len(windows_audio_clients)
     })
 
+# Module metadata is static - serialize it once instead of on every request
+_MODULES_JSON = json_dumps({
+    'modules': {
+        'test': {
+            'name': 'Test Mode',
+            'description': 'Test without real audio - generates sample transcriptions',
+            'status': 'available',
+            'badge': '✅ Ready',
+            'badge_color': 'success'
+        },
+        'windows_capture': {
+            'name': 'Windows Audio Bridge',
+            'description': 'Direct Windows audio capture (requires Windows client)',
+            'status': 'available',
+            'badge': '✅ Ready',
+            'badge_color': 'success',
+            'config_fields': [
+                {
+                    'name': 'capture_mode',
+                    'type': 'select',
+                    'options': ['loopback', 'microphone', 'both'],
+                    'default': 'loopback',
+                    'description': 'What audio to capture'
+                }
+            ]
+        },
+        'pulseaudio': {
+            'name': 'PulseAudio',
+            'description': 'Capture audio from PulseAudio server (Linux/WSL)',
+            'status': 'available',
+            'badge': '✅ Ready',
+            'badge_color': 'success',
+            'config_fields': [
+                {
+                    'name': 'server',
+                    'type': 'text',
+                    'default': 'tcp:host.docker.internal:4713',
+                    'description': 'PulseAudio server address'
+                }
+            ]
+        },
+        'voicemeeter': {
+            'name': 'VoiceMeeter',
+            'description': 'Capture from VoiceMeeter via VBAN protocol (Windows)',
+            'status': 'needs_setup',
+            'badge': '⚙️ Setup Required',
+            'badge_color': 'warning',
+            'config_fields': [
+                {
+                    'name': 'connection_type',
+                    'type': 'select',
+                    'options': ['vban', 'tcp'],
+                    'default': 'vban',
+                    'description': 'Connection protocol'
+                },
+                {
+                    'name': 'port',
+                    'type': 'number',
+                    'default': 6980,
+                    'description': 'Port number (6980 for VBAN)'
+                }
+            ]
+        }
+    }
+})
+
+_DETECT_JSON = json_dumps({
+    'modules': {
+        'test': {
+            'name': 'Test Mode',
+            'description': 'Test without real audio',
+            'status': 'available',
+            'badge': '✅ Ready',
+            'badge_color': 'success',
+            'auto_score': 10
+        },
+        'windows_capture': {
+            'name': 'Windows Audio Bridge',
+            'description': 'Direct Windows audio capture',
+            'status': 'available',
+            'badge': '✅ Ready',
+            'badge_color': 'success',
+            'auto_score': 80
+        }
+    },
+    'recommended': 'windows_capture'
+})
+
+def cached_json_response(body, max_age=60):
+    """Return a precomputed JSON body the browser may reuse for max_age seconds"""
+    response = Response(body, mimetype='application/json')
+    response.headers['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
 @app.route('/api/audio/modules')
 def get_modules():
     """Get available audio modules"""
-    return jsonify({
-        'modules': {
-            'test': {
-                'name': 'Test Mode',
-                'description': 'Test without real audio - generates sample transcriptions',
-                'status': 'available',
-                'badge': '✅ Ready',
-                'badge_color': 'success'
-            },
-            'windows_capture': {
-                'name': 'Windows Audio Bridge',
-                'description': 'Direct Windows audio capture (requires Windows client)',
-                'status': 'available',
-                'badge': '✅ Ready',
-                'badge_color': 'success',
-                'config_fields': [
-                    {
-                        'name': 'capture_mode',
-                        'type': 'select',
-                        'options': ['loopback', 'microphone', 'both'],
-                        'default': 'loopback',
-                        'description': 'What audio to capture'
-                    }
-                ]
-            },
-            'pulseaudio': {
-                'name': 'PulseAudio',
-                'description': 'Capture audio from PulseAudio server (Linux/WSL)',
-                'status': 'available',
-                'badge': '✅ Ready',
-                'badge_color': 'success',
-                'config_fields': [
-                    {
-                        'name': 'server',
-                        'type': 'text',
-                        'default': 'tcp:host.docker.internal:4713',
-                        'description': 'PulseAudio server address'
-                    }
-                ]
-            },
-            'voicemeeter': {
-                'name': 'VoiceMeeter',
-                'description': 'Capture from VoiceMeeter via VBAN protocol (Windows)',
-                'status': 'needs_setup',
-                'badge': '⚙️ Setup Required',
-                'badge_color': 'warning',
-                'config_fields': [
-                    {
-                        'name': 'connection_type',
-                        'type': 'select',
-                        'options': ['vban', 'tcp'],
-                        'default': 'vban',
-                        'description': 'Connection protocol'
-                    },
-                    {
-                        'name': 'port',
-                        'type': 'number',
-                        'default': 6980,
-                        'description': 'Port number (6980 for VBAN)'
-                    }
-                ]
-            }
-        }
-    })
+    return cached_json_response(_MODULES_JSON)
 
 @app.route('/api/audio/detect')
 def detect_audio():
     """Auto-detect available audio modules"""
-    return jsonify({
-        'modules': {
-            'test': {
-                'name': 'Test Mode',
-                'description': 'Test without real audio',
-                'status': 'available',
-                'badge': '✅ Ready',
-                'badge_color': 'success',
-                'auto_score': 10
-            },
-            'windows_capture': {
-                'name': 'Windows Audio Bridge',
-                'description': 'Direct Windows audio capture',
-                'status': 'available',
-                'badge': '✅ Ready',
-                'badge_color': 'success',
-                'auto_score': 80
-            }
-        },
-        'recommended': 'windows_capture'
-    })
+    return cached_json_response(_DETECT_JSON)
 
 # Replace the scan-devices endpoint in main.py with this fixed version:
 
@@ -302,44 +468,31 @@ def scan_devices():
     # Create a simple synchronous version
     import uuid
     request_id = str(uuid.uuid4())
-    device_requests[request_id] = {'type': 'list', 'result': None, 'completed': False}
+    future = device_requests[request_id] = Future()
     
     # Send command to Windows clients
-    command = json.dumps({
+    command = json_dumps({
         'command': 'list_devices',
         'request_id': request_id
     })
     
-    # Send to connected clients synchronously
+    # Send to connected clients
     disconnected_clients = []
-    for client in windows_audio_clients:
+    for client in windows_clients_snapshot():
         try:
-            # Use asyncio.run to execute the async send
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(client.send(command))
-            loop.close()
+            send_to_windows_client(client, command)
         except Exception as e:
             logger.error(f"Failed to send to client: {e}")
             disconnected_clients.append(client)
     
     # Remove disconnected clients
     for client in disconnected_clients:
-        windows_audio_clients.discard(client)
+        remove_windows_client(client)
     
     # Wait for response (max 5 seconds)
-    start_time = time.time()
-    while time.time() - start_time < 5:
-        if request_id in device_requests and device_requests[request_id]['completed']:
-            result = device_requests[request_id]['result']
-            del device_requests[request_id]
-            return jsonify(result)
-        time.sleep(0.1)
-    
-    # Cleanup on timeout
-    if request_id in device_requests:
-        del device_requests[request_id]
+    result = wait_for_device_request(future, request_id, timeout=5)
+    if result is not None:
+        return jsonify(result)
     
     return jsonify({
         'devices': [],
@@ -361,9 +514,9 @@ def test_device():
     # Create request
     import uuid
     request_id = str(uuid.uuid4())
-    device_requests[request_id] = {'type': 'test', 'result': None, 'completed': False}
+    future = device_requests[request_id] = Future()
     
-    command = json.dumps({
+    command = json_dumps({
         'command': 'test_device',
         'device_index': device_index,
         'request_id': request_id
@@ -371,36 +524,25 @@ def test_device():
     
     # Send to first available client
     sent = False
-    for client in list(windows_audio_clients):
+    for client in windows_clients_snapshot():
         try:
-            import asyncio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(client.send(command))
-            loop.close()
+            send_to_windows_client(client, command)
             sent = True
             break
         except Exception as e:
             logger.error(f"Failed to send test command: {e}")
     
     if not sent:
+        device_requests.pop(request_id, None)
         return jsonify({
             'success': False,
             'error': 'Failed to send command to Windows client'
         }), 500
     
-    # Wait for response
-    start_time = time.time()
-    while time.time() - start_time < 10:  # 10 seconds for device test
-        if request_id in device_requests and device_requests[request_id]['completed']:
-            result = device_requests[request_id]['result']
-            del device_requests[request_id]
-            return jsonify(result)
-        time.sleep(0.1)
-    
-    # Cleanup on timeout
-    if request_id in device_requests:
-        del device_requests[request_id]
+    # Wait for response (10 seconds for device test)
+    result = wait_for_device_request(future, request_id, timeout=10)
+    if result is not None:
+        return jsonify(result)
     
     return jsonify({
         'success': False,
@@ -439,8 +581,9 @@ def start_audio():
             module = importlib.import_module(module_path)
             module_class = getattr(module, class_name)
             
-            # Create instance with access to the audio queue
-            audio_manager = module_class(ws_server, config, windows_audio_queue)
+            # Create instance with access to the audio queue, reading it
+            # in the format connected clients announced
+            audio_manager = module_class(ws_server, {**config, **client_audio_format}, windows_audio_queue)
             
             # Start in thread
             current_audio_thread = threading.Thread(target=audio_manager.start)
@@ -510,28 +653,37 @@ def send_test_message():
     
     return jsonify({"error": "WebSocket server not available"}), 503
 
-if __name__ == '__main__':
+_background_started = False
+_background_lock = threading.Lock()
+
+def start_background_services():
+    """Start the WebSocket servers and the configured auto-start module
+    
+    Called from __main__ and from wsgi.py; safe to call more than once.
+    """
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+    
     # Start WebSocket server
     logger.info("Starting WebSocket server...")
-    ws_server.start()
+    ws_server.start(ready_timeout=5)
     
-    # Start Windows audio WebSocket server
+    # Start Windows audio WebSocket server on the same loop
     logger.info("Starting Windows audio server on port 8766...")
-    windows_thread = threading.Thread(target=start_windows_audio_server)
-    windows_thread.daemon = True
-    windows_thread.start()
+    start_windows_audio_server()
     
-    # Give servers time to start
-    time.sleep(2)
-    
-     # Auto-start audio module if configured
+    # Auto-start audio module if configured
     if os.environ.get('AUTO_START_MODULE'):
         auto_start_thread = threading.Thread(target=auto_start_audio_module)
         auto_start_thread.daemon = True
         auto_start_thread.start()
 
-    time.sleep(2)
+if __name__ == '__main__':
+    start_background_services()
     
-    # Start Flask app
+    # Development server - for production run wsgi.py under gunicorn
     logger.info("Starting Flask API server...")
-    app.run(host='0.0.0.0', port=8000, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=8000, debug=False, threaded=True)
@@ -5,11 +5,17 @@ import json
 import sys
 from datetime import datetime
 
-def view_translation_logs(log_file='/app/translations/libretranslate_log.json', last_n=10):
+def load_translation_logs(log_file):
+    """Load log entries from a JSON Lines file (or a legacy JSON array)"""
+    with open(log_file, 'r', encoding='utf-8') as f:
+        if log_file.endswith('.json'):
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+def view_translation_logs(log_file='/app/translations/libretranslate_log.jsonl', last_n=10):
     """View translation logs"""
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
+        logs = load_translation_logs(log_file)
         
         print(f"\n📋 Translation Log Viewer")
         print(f"   Total entries: {len(logs)}")
@@ -77,7 +83,7 @@ def view_translation_logs(log_file='/app/translations/libretranslate_log.json',
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def tail_translation_logs(log_file='/app/translations/libretranslate_log.json'):
+def tail_translation_logs(log_file='/app/translations/libretranslate_log.jsonl'):
     """Tail translation logs in real-time"""
     import time
     
@@ -89,8 +95,7 @@ def tail_translation_logs(log_file='/app/translations/libretranslate_log.json'):
     try:
         while True:
             try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
+                logs = load_translation_logs(log_file)
                 
                 # Check for new entries
                 if len(logs) > len(last_entries):
@@ -124,7 +129,7 @@ if __name__ == "__main__":
                         help='Number of recent entries to show (default: 10)')
     parser.add_argument('-f', '--follow', action='store_true',
                         help='Follow log file (like tail -f)')
-    parser.add_argument('--file', default='/app/translations/libretranslate_log.json',
+    parser.add_argument('--file', default='/app/translations/libretranslate_log.jsonl',
                         help='Path to log file')
     
     args = parser.parse_args()
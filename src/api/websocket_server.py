@@ -6,37 +6,82 @@ import threading
 import logging
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def json_dumps(obj):
+    """Serialize to a JSON str - browsers JSON.parse text frames, not bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def json_loads(data):
+    """Parse a JSON str or bytes message"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class TranscriptionWebSocketServer:
     """WebSocket server for browser extension communication"""
     
+    SEND_QUEUE_SIZE = 32  # Broadcasts buffered per client before it's dropped
+    
     def __init__(self, port=8765, host='0.0.0.0'):
         self.port = port
         self.host = host
         self.clients = set()
+        self._send_queues = {}  # websocket -> bounded queue drained by its relay task
+        self._closing = set()  # Close tasks for clients that fell behind
         self.running = False
         self.server = None
         self.loop = None
         self.thread = None
+        self.ready = threading.Event()  # Set once the server is listening
+        
+    def start(self, run_in_this_thread=False, ready_timeout=2):
+        """Start WebSocket server
         
-    def start(self):
-        """Start WebSocket server in background thread"""
+        By default the server runs in a background thread and this returns
+        once it is listening (or after ready_timeout seconds). With
+        run_in_this_thread=True the event loop runs on the caller's thread
+        and this blocks until the server stops.
+        """
         if self.running:
             logger.warning("WebSocket server already running")
             return
             
         self.running = True
+        self.ready.clear()
+        logger.info(f"WebSocket server starting on ws://{self.host}:{self.port}")
+        
+        if run_in_this_thread:
+            self._run_server()
+            return
+        
         self.thread = threading.Thread(target=self._run_server)
         self.thread.daemon = True
         self.thread.start()
-        logger.info(f"WebSocket server starting on ws://{self.host}:{self.port}")
+        
+        if not self.ready.wait(timeout=ready_timeout):
+            logger.warning(f"WebSocket server not ready after {ready_timeout}s")
         
     def _run_server(self):
         """Run the asyncio event loop"""
         try:
-            self.loop = asyncio.new_event_loop()
+            # libuv-backed loop when available - it serves both WebSocket endpoints
+            self.loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
             self.loop.run_until_complete(self._start_server())
         except Exception as e:
@@ -53,9 +98,17 @@ class TranscriptionWebSocketServer:
                 self.host,
                 self.port,
                 ping_interval=20,
-                ping_timeout=10
+                ping_timeout=10,
+                # Messages are small JSON transcriptions - keep per-client
+                # buffers small instead of the 1 MiB library defaults
+                compression=None,
+                max_size=16 * 1024,
+                max_queue=8,
+                read_limit=16 * 1024,
+                write_limit=16 * 1024
             )
             logger.info(f"WebSocket server listening on {self.host}:{self.port}")
+            self.ready.set()
             
             # Keep server running
             while self.running:
@@ -63,49 +116,73 @@ class TranscriptionWebSocketServer:
                 
         except Exception as e:
             logger.error(f"Failed to start WebSocket server: {e}")
+            # Don't leave start() waiting for a server that never came up
+            self.ready.set()
+            
+    def serve(self, handler, host, port, timeout=5, **kwargs):
+        """Run another websockets server on this server's event loop
+        
+        Lets other endpoints share the loop instead of running their own
+        thread and loop. Returns the websockets server object.
+        """
+        if not self.loop or not self.ready.is_set():
+            raise RuntimeError("WebSocket server is not running")
+        
+        async def _serve():
+            return await websockets.serve(handler, host, port, **kwargs)
+        
+        return asyncio.run_coroutine_threadsafe(_serve(), self.loop).result(timeout)
             
     async def handle_client(self, websocket, path):
         """Handle client connections"""
         client_addr = websocket.remote_address if websocket.remote_address else "unknown"
         logger.info(f"Client connected: {client_addr}")
+        send_queue = asyncio.Queue(maxsize=self.SEND_QUEUE_SIZE)
+        self._send_queues[websocket] = send_queue
         self.clients.add(websocket)
+        relay = asyncio.create_task(self._relay(websocket, send_queue))
         
         try:
             # Send connection confirmation
-            await websocket.send(json.dumps({
+            await websocket.send(json_dumps({
                 "type": "connection",
                 "status": "connected",
                 "message": "Connected to transcription server",
                 "timestamp": datetime.now().isoformat()
             }))
             
-            # Keep connection alive - THIS WAS MISSING!
-            while True:
-                try:
-                    # Wait for messages or ping/pong
-                    message = await asyncio.wait_for(websocket.recv(), timeout=30)
-                    # Handle any incoming messages
-                    if message:
-                        logger.debug(f"Received from client: {message}")
-                except asyncio.TimeoutError:
-                    # Send ping to keep alive
-                    await websocket.ping()
-                except websockets.exceptions.ConnectionClosed:
-                    break
+            # Keep connection alive until the client leaves - keepalive pings
+            # come from ping_interval/ping_timeout on the server
+            async for message in websocket:
+                # Clients don't send anything we act on - only pay for
+                # formatting when debug logging is actually enabled.
+                # Binary frames arrive as bytes and skip UTF-8 decoding.
+                if message and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received from client: %r", message[:200])
                     
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Client disconnected: {client_addr}")
         except Exception as e:
             logger.error(f"Error handling client: {e}")
         finally:
+            relay.cancel()
             self.clients.discard(websocket)
+            self._send_queues.pop(websocket, None)
+    
+    async def _relay(self, websocket, send_queue):
+        """Send queued broadcasts to one client in order"""
+        try:
+            while True:
+                await websocket.send(await send_queue.get())
+        except websockets.exceptions.ConnectionClosed:
+            pass
             
     def broadcast_transcription(self, text, lang="en", translation=None):
         """Send transcription to all connected clients"""
         if not self.clients or not self.loop:
             return
             
-        message = json.dumps({
+        message = json_dumps({
             "type": "transcription",
             "timestamp": datetime.now().isoformat(),
             "text": text,
@@ -114,25 +191,24 @@ class TranscriptionWebSocketServer:
         })
         
         # Send to all clients
-        asyncio.run_coroutine_threadsafe(
-            self._broadcast(message),
-            self.loop
-        )
+        self.loop.call_soon_threadsafe(self._broadcast, message)
         
-    async def _broadcast(self, message):
-        """Broadcast message to all clients"""
-        if self.clients:
-            # Send to all clients concurrently
-            disconnected = []
-            for client in list(self.clients):
-                try:
-                    await client.send(message)
-                except:
-                    disconnected.append(client)
-            
-            # Remove disconnected clients
-            for client in disconnected:
+    def _broadcast(self, message):
+        """Queue message for every client's relay task (runs on the loop)"""
+        for client in list(self.clients):
+            send_queue = self._send_queues.get(client)
+            if send_queue is None:
+                continue
+            try:
+                send_queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind to catch up - drop it rather than buffer forever
+                logger.warning(f"Client {client.remote_address} too slow, disconnecting")
                 self.clients.discard(client)
+                self._send_queues.pop(client, None)
+                task = asyncio.ensure_future(client.close(code=1013, reason="Client too slow"))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
 
     def stop(self):
         """Stop the WebSocket server"""
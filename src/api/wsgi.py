@@ -0,0 +1,14 @@
+# api-server/wsgi.py
+"""WSGI entry point for running the API under a production server
+
+    gunicorn -k gthread -w 1 --threads 16 -b 0.0.0.0:8000 wsgi:app
+
+gunicorn is listed in requirements.txt (pip install gunicorn otherwise);
+the Docker images still start main.py directly.
+
+Keep a single worker: the WebSocket servers, audio module and device
+requests all live in this process.
+"""
+from main import app, start_background_services
+
+start_background_services()
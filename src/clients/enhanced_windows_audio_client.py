@@ -3,15 +3,119 @@ import pyaudiowpatch as pyaudio
 import asyncio
 import websockets
 import numpy as np
-import threading
 import json
-from queue import Queue
+import sys
+import struct
+import warnings
+from collections import deque
 import time
 
+# Queued chunks are sent together: each one is prefixed with its device
+# index and byte length, up to about BATCH_TARGET_BYTES per frame
+BATCH_HEADER = struct.Struct('<HI')
+BATCH_TARGET_BYTES = 32768
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # Removed in Python 3.13
+    AUDIOOP_AVAILABLE = True
+except ImportError:
+    AUDIOOP_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _peak_i16(samples):
+        """abs+max in one vectorizable pass, without an int32 temporary"""
+        peak = 0
+        for i in range(samples.shape[0]):
+            v = abs(np.int32(samples[i]))
+            if v > peak:
+                peak = v
+        return peak
+
+def peak_level(data):
+    """Peak absolute sample value of 16-bit PCM bytes"""
+    if AUDIOOP_AVAILABLE:
+        return audioop.max(data, 2)
+    samples = np.frombuffer(data, dtype=np.int16)
+    if NUMBA_AVAILABLE:
+        return int(_peak_i16(samples))
+    return int(np.abs(samples, dtype=np.int32).max())
+
+def downmix_to_mono(data):
+    """Average interleaved 16-bit stereo PCM into mono"""
+    if AUDIOOP_AVAILABLE:
+        return audioop.tomono(data, 2, 0.5, 0.5)
+    stereo = np.frombuffer(data, dtype=np.int16).reshape(-1, 2)
+    return ((stereo[:, 0].astype(np.int32) + stereo[:, 1]) >> 1).astype(np.int16).tobytes()
+
+class Decimator:
+    """Streaming low-pass + integer-ratio decimation of interleaved int16 PCM
+
+    audioop.ratecv only interpolates linearly, which folds everything above
+    8kHz back into the speech band when going 48kHz -> 16kHz; a windowed-sinc
+    FIR keeps it out. Filter history and phase carry over between chunks.
+    """
+
+    def __init__(self, factor, channels, taps=63):
+        self.factor = factor
+        self.channels = channels
+        n = np.arange(taps) - (taps - 1) / 2
+        cutoff = 0.45 / factor  # Just under the output Nyquist, in cycles/sample
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+        self.kernel = (kernel / kernel.sum())[::-1].astype(np.float32)
+        self.history = np.zeros((taps - 1, channels), dtype=np.float32)
+        self.phase = 0
+
+    def process(self, data):
+        frames = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+        x = np.concatenate((self.history, frames.astype(np.float32)))
+        taps = self.kernel.size
+        out = np.empty((len(range(self.phase, len(frames), self.factor)), self.channels), dtype=np.float32)
+        for c in range(self.channels):
+            # Only evaluate the filter at the output sample positions
+            windows = np.lib.stride_tricks.sliding_window_view(x[:, c], taps)
+            out[:, c] = windows[self.phase::self.factor] @ self.kernel
+        self.phase = (self.phase - len(frames)) % self.factor
+        self.history = x[-(taps - 1):]
+        np.rint(out, out=out)
+        return np.clip(out, -32768, 32767).astype(np.int16).tobytes()
+
+def make_resampler(rate, channels, target=16000):
+    """Return a bytes -> bytes converter from rate to target, or None if not needed"""
+    if rate == target:
+        return None
+    if rate % target == 0:
+        return Decimator(rate // target, channels).process
+    if AUDIOOP_AVAILABLE:
+        state = None
+        def ratecv(data):
+            nonlocal state
+            converted, state = audioop.ratecv(data, 2, channels, rate, target, state)
+            return converted
+        return ratecv
+    return None
+
 class EnhancedAudioCapture:
-    def __init__(self):
+    def __init__(self, mono=False, resample_16k=False):
         self.p = pyaudio.PyAudio()
-        self.audio_queue = Queue()
+        self.mono = mono  # Downmix stereo before sending - half the bytes
+        self.resample_16k = resample_16k  # Send 16kHz - a third of the bytes at 48kHz
+        self.send_rate = None  # Sample rate actually sent, once capture starts
+        self.send_channels = None  # Channel count actually sent, once capture starts
+        self.stream = None
+        # Capture threads append, the sender coroutine pops; the oldest chunks
+        # drop if the connection can't keep up
+        self.audio_queue = deque(maxlen=512)
+        self._audio_ready = None  # asyncio.Event owned by the sender's loop
+        self._loop = None
         self.running = False
         
     def find_devices(self):
@@ -50,86 +154,147 @@ class EnhancedAudioCapture:
         return devices
     
     def start_capture(self, device_index, device_info):
-        """Start capturing from a specific device"""
+        """Start capturing from a specific device
+        
+        PortAudio delivers buffers to a callback on its own thread, so no
+        Python thread sits in a blocking read per device.
+        """
         try:
             # Use highest quality settings
             channels = min(device_info['maxInputChannels'], 2)
             rate = int(device_info['defaultSampleRate'])
             
-            stream = self.p.open(
+            downmix = self.mono and channels == 2
+            resample = make_resampler(rate, 1 if downmix else channels) if self.resample_16k else None
+            if self.resample_16k and resample is None and rate != 16000:
+                print(f"⚠️  Can't resample {rate}Hz to 16kHz here - sending {rate}Hz")
+            self.send_rate = 16000 if resample else rate
+            self.send_channels = 1 if downmix else channels
+            
+            def callback(data, frame_count, time_info, status):
+                if not self.running:
+                    return (None, pyaudio.paComplete)
+                try:
+                    if downmix:
+                        data = downmix_to_mono(data)
+                    if resample:
+                        data = resample(data)
+                    # Add device ID to the data for mixing
+                    self._enqueue(device_index, data)
+                except Exception as e:
+                    print(f"❌ Capture error: {e}")
+                    return (None, pyaudio.paAbort)
+                return (None, pyaudio.paContinue)
+            
+            self.stream = self.p.open(
                 format=pyaudio.paInt16,
                 channels=channels,
                 rate=rate,
                 input=True,
                 input_device_index=device_index,
-                frames_per_buffer=2048
+                frames_per_buffer=2048,
+                stream_callback=callback
             )
+            self.stream.start_stream()
             
-            print(f"✅ Started capture: {device_info['name']} ({rate}Hz, {channels}ch)")
-            
-            while self.running:
-                try:
-                    data = stream.read(2048, exception_on_overflow=False)
-                    if data:
-                        # Add device ID to the data for mixing
-                        self.audio_queue.put((device_index, data))
-                        
-                except Exception as e:
-                    print(f"❌ Capture error: {e}")
-                    break
-                    
-            stream.stop_stream()
-            stream.close()
-            print(f"🛑 Stopped capture: {device_info['name']}")
+            print(f"✅ Started capture: {device_info['name']} ({rate}Hz, {channels}ch"
+                  f"{' -> mono' if downmix else ''}{' -> 16kHz' if resample else ''})")
             
         except Exception as e:
             print(f"❌ Failed to start capture: {e}")
     
+    def stop_capture(self):
+        """Stop and close the capture stream"""
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+            print("🛑 Stopped capture")
+    
+    def _enqueue(self, device_index, data):
+        """Hand a captured chunk to the sender (called from capture threads)"""
+        self.audio_queue.append((device_index, data))
+        loop = self._loop
+        if loop is not None and not self._audio_ready.is_set():
+            try:
+                loop.call_soon_threadsafe(self._audio_ready.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+    
     async def stream_to_docker(self):
         """Stream mixed audio to Docker"""
+        self._audio_ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
         print("🔗 Connecting to Docker...")
         
-        async with websockets.connect('ws://localhost:8766') as ws:
+        async with websockets.connect('ws://localhost:8766', compression=None) as ws:
             print("✅ Connected to Docker!")
             
             # Send info about our client
             await ws.send(json.dumps({
                 'type': 'client_info',
                 'client': 'enhanced_windows_capture',
-                'mode': 'mixed_audio'
+                'mode': 'mixed_audio',
+                'framing': 'batched',
+                'channels': self.send_channels,
+                'sample_rate': self.send_rate
             }))
             
             bytes_sent = 0
             chunks_sent = 0
-            last_status = time.time()
+            frames_sent = 0
+            # One send buffer for the whole connection; the library copies it
+            # into the outgoing frame, so it can be refilled after each send
+            frame = bytearray(2 * BATCH_TARGET_BYTES)
+            frame_view = memoryview(frame)
+            last_status = time.monotonic()
             
             while self.running:
                 try:
                     # Get audio from queue
-                    if not self.audio_queue.empty():
-                        device_id, data = self.audio_queue.get_nowait()
-                        
-                        # Send raw audio data
-                        await ws.send(data)
+                    if self.audio_queue:
+                        # Pack everything already queued into the reused frame buffer
+                        size = 0
+                        while self.audio_queue and size < BATCH_TARGET_BYTES:
+                            device_id, data = self.audio_queue.popleft()
+                            end = size + BATCH_HEADER.size + len(data)
+                            if end > len(frame):
+                                # Oversized chunk - grow the buffer (the view must go first)
+                                frame_view.release()
+                                frame.extend(bytes(end - len(frame)))
+                                frame_view = memoryview(frame)
+                            BATCH_HEADER.pack_into(frame, size, device_id, len(data))
+                            frame_view[size + BATCH_HEADER.size:end] = data
+                            size = end
+                            bytes_sent += len(data)
+                            chunks_sent += 1
                         
-                        bytes_sent += len(data)
-                        chunks_sent += 1
+                        await ws.send(frame_view[:size])
+                        frames_sent += 1
                         
-                        # Show status every 5 seconds
-                        if time.time() - last_status > 5:
-                            audio_array = np.frombuffer(data, dtype=np.int16)
-                            level = np.max(np.abs(audio_array))
+                        # Show status every 5 seconds - only look at the clock every 64 frames
+                        if frames_sent & 0x3F == 0 and time.monotonic() - last_status > 5:
+                            level = peak_level(data)
                             print(f"📊 Sent: {chunks_sent} chunks, {bytes_sent:,} bytes, Level: {level}")
-                            last_status = time.time()
+                            last_status = time.monotonic()
                     else:
-                        await asyncio.sleep(0.01)
+                        # Sleep until a capture thread signals new audio; re-check
+                        # after clearing in case a chunk landed in between
+                        self._audio_ready.clear()
+                        if not self.audio_queue:
+                            try:
+                                await asyncio.wait_for(self._audio_ready.wait(), timeout=0.5)
+                            except asyncio.TimeoutError:
+                                pass
                         
                 except Exception as e:
                     print(f"❌ Stream error: {e}")
                     break
 
 async def main():
-    capture = EnhancedAudioCapture()
+    # --mono and --16k shrink what's sent; start the server module with
+    # matching channels / sample_rate
+    capture = EnhancedAudioCapture(mono='--mono' in sys.argv, resample_16k='--16k' in sys.argv)
     devices = capture.find_devices()
     
     # Priority: What U Hear > Microphone > System Audio
@@ -154,14 +319,9 @@ async def main():
     
     capture.running = True
     
-    # Start capture thread
+    # Start capture (runs on PortAudio's callback thread)
     device_index, device_info = device_to_use
-    capture_thread = threading.Thread(
-        target=capture.start_capture, 
-        args=(device_index, device_info)
-    )
-    capture_thread.daemon = True
-    capture_thread.start()
+    capture.start_capture(device_index, device_info)
     
     try:
         # Start streaming
@@ -170,6 +330,7 @@ async def main():
         print("\n🛑 Stopping...")
     finally:
         capture.running = False
+        capture.stop_capture()
         capture.p.terminate()
 
 if __name__ == "__main__":
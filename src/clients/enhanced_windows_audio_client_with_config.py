@@ -3,24 +3,173 @@ import pyaudiowpatch as pyaudio
 import asyncio
 import websockets
 import numpy as np
-import threading
 import json
 import time
 import os
 import sys
-from queue import Queue
+import struct
+import warnings
+from collections import deque
 from pathlib import Path
 
+# Queued chunks are sent together: each one is prefixed with its device
+# index and byte length, up to about BATCH_TARGET_BYTES per frame
+BATCH_HEADER = struct.Struct('<HI')
+BATCH_TARGET_BYTES = 32768
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # Removed in Python 3.13
+    AUDIOOP_AVAILABLE = True
+except ImportError:
+    AUDIOOP_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def json_dumps(obj):
+    """Serialize to a JSON str - the control page JSON.parses text frames"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def json_loads(data):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _peak_i16(samples):
+        """abs+max in one vectorizable pass, without an int32 temporary"""
+        peak = 0
+        for i in range(samples.shape[0]):
+            v = abs(np.int32(samples[i]))
+            if v > peak:
+                peak = v
+        return peak
+
+def peak_level(data):
+    """Peak absolute sample value of 16-bit PCM bytes"""
+    if AUDIOOP_AVAILABLE:
+        return audioop.max(data, 2)
+    samples = np.frombuffer(data, dtype=np.int16)
+    if NUMBA_AVAILABLE:
+        return int(_peak_i16(samples))
+    return int(np.abs(samples, dtype=np.int32).max())
+
+def downmix_to_mono(data):
+    """Average interleaved 16-bit stereo PCM into mono"""
+    if AUDIOOP_AVAILABLE:
+        return audioop.tomono(data, 2, 0.5, 0.5)
+    stereo = np.frombuffer(data, dtype=np.int16).reshape(-1, 2)
+    return ((stereo[:, 0].astype(np.int32) + stereo[:, 1]) >> 1).astype(np.int16).tobytes()
+
+class Decimator:
+    """Streaming low-pass + integer-ratio decimation of interleaved int16 PCM
+
+    audioop.ratecv only interpolates linearly, which folds everything above
+    8kHz back into the speech band when going 48kHz -> 16kHz; a windowed-sinc
+    FIR keeps it out. Filter history and phase carry over between chunks.
+    """
+
+    def __init__(self, factor, channels, taps=63):
+        self.factor = factor
+        self.channels = channels
+        n = np.arange(taps) - (taps - 1) / 2
+        cutoff = 0.45 / factor  # Just under the output Nyquist, in cycles/sample
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+        self.kernel = (kernel / kernel.sum())[::-1].astype(np.float32)
+        self.history = np.zeros((taps - 1, channels), dtype=np.float32)
+        self.phase = 0
+
+    def process(self, data):
+        frames = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+        x = np.concatenate((self.history, frames.astype(np.float32)))
+        taps = self.kernel.size
+        out = np.empty((len(range(self.phase, len(frames), self.factor)), self.channels), dtype=np.float32)
+        for c in range(self.channels):
+            # Only evaluate the filter at the output sample positions
+            windows = np.lib.stride_tricks.sliding_window_view(x[:, c], taps)
+            out[:, c] = windows[self.phase::self.factor] @ self.kernel
+        self.phase = (self.phase - len(frames)) % self.factor
+        self.history = x[-(taps - 1):]
+        np.rint(out, out=out)
+        return np.clip(out, -32768, 32767).astype(np.int16).tobytes()
+
+def make_resampler(rate, channels, target=16000):
+    """Return a bytes -> bytes converter from rate to target, or None if not needed"""
+    if rate == target:
+        return None
+    if rate % target == 0:
+        return Decimator(rate // target, channels).process
+    if AUDIOOP_AVAILABLE:
+        state = None
+        def ratecv(data):
+            nonlocal state
+            converted, state = audioop.ratecv(data, 2, channels, rate, target, state)
+            return converted
+        return ratecv
+    return None
+
+# Sent every status update - formatted directly instead of through the JSON encoder
+_LEVEL_MESSAGE = '{"type":"audio_level","device":%d,"level":%d}'
+# Sent on every (re)connect; only the audio format varies with the config
+_CLIENT_INFO_MESSAGE = ('{"type":"client_info","client":"enhanced_windows_capture","mode":"configurable",'
+                        '"framing":"batched","channels":%d,"sample_rate":%d}')
+
+# (name substring, device type, emoji) - first match wins
+_DEVICE_TYPES = (
+    ('what u hear', 'what_u_hear', '✅'),
+    ('mic', 'microphone', '🎤'),  # Also covers "microphone"
+    ('[loopback]', 'system_audio', '🔊'),
+    ('speaker', 'system_audio', '🔊'),
+)
+
+def pin_current_thread(cpu):
+    """Pin the calling thread to one CPU; returns False where unsupported"""
+    cpu %= os.cpu_count() or 1
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            return kernel32.SetThreadAffinityMask(kernel32.GetCurrentThread(), 1 << cpu) != 0
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {cpu})  # 0 is the calling thread on Linux
+            return True
+    except (OSError, AttributeError):
+        pass
+    return False
+
 class ConfigurableAudioCapture:
     def __init__(self, config_path="audio_config.json"):
         self.p = pyaudio.PyAudio()
-        self.audio_queue = Queue()
+        # Capture threads append, the sender coroutine pops; the oldest chunks
+        # drop if the connection can't keep up
+        self.audio_queue = deque(maxlen=512)
+        self._audio_ready = None  # asyncio.Event owned by the sender's loop
+        self._loop = None
+        self._audio_ws = None  # Open server connection, for format updates
+        self.recent_levels = {}  # device_index -> peak level of its latest metered chunk
+        self._level_last_computed = {}  # device_index -> monotonic time of last meter update
+        self._announced_info = None  # client_info last sent on it
         self.running = False
         self.config_path = config_path
         self.config = self.load_config()
         self.active_streams = {}
         self.control_ws = None
         self.available_devices = []
+        self._save_pending = False  # Config changed, written by save_loop
         
     def load_config(self):
         """Load configuration from file or create default"""
@@ -29,6 +178,9 @@ class ConfigurableAudioCapture:
             "active_devices": [],
             "sample_rate": 48000,
             "buffer_size": 2048,
+            "mono": False,  # Downmix stereo before sending (server module needs channels=1)
+            "resample_16k": False,  # Send 16kHz audio (server module needs sample_rate=16000)
+            "pin_capture_threads": False,  # Keep each device's PortAudio thread on one CPU
             "capture_mode": "auto",
             "server_url": "ws://localhost:8766",
             "control_port": 8768
@@ -50,64 +202,71 @@ class ConfigurableAudioCapture:
         print("📝 Using default configuration")
         return default_config
     
-    def save_config(self):
-        """Save current configuration to file"""
+    def save_config(self, config=None):
+        """Save current configuration (or the given snapshot of it) to file"""
+        if config is None:
+            config = self.config
         try:
             with open(self.config_path, 'w') as f:
-                json.dump(self.config, f, indent=2)
+                json.dump(config, f, indent=2)
             print(f"💾 Config saved to {self.config_path}")
         except Exception as e:
             print(f"❌ Error saving config: {e}")
     
+    async def save_loop(self, interval=1.0):
+        """Write pending config changes at most once per interval, off the event loop
+        
+        Device toggles from the control page only mark the config dirty, so a
+        burst of them costs one file write instead of one each.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self._save_pending:
+                self._save_pending = False
+                await asyncio.to_thread(self.save_config, dict(self.config))
+    
     def scan_devices(self):
         """Scan all available audio devices"""
         self.available_devices = []
         print("\n🔍 Scanning audio devices...")
-        print("=" * 80)
+        # Collect the listing and write it in one go rather than a print per device
+        lines = ["=" * 80]
         
         for i in range(self.p.get_device_count()):
             try:
                 info = self.p.get_device_info_by_index(i)
                 if info['maxInputChannels'] > 0:
+                    device_type, type_emoji = self._get_device_type(info['name'])
                     device = {
                         'index': i,
                         'name': info['name'],
-                        'type': self._get_device_type(info['name']),
+                        'type': device_type,
                         'channels': info['maxInputChannels'],
                         'sample_rate': int(info['defaultSampleRate']),
                         'is_loopback': info.get('isLoopbackDevice', False) or '[Loopback]' in info['name']
                     }
                     self.available_devices.append(device)
                     
-                    # Print device info
-                    type_emoji = {
-                        'microphone': '🎤',
-                        'system_audio': '🔊',
-                        'what_u_hear': '✅',
-                        'unknown': '❓'
-                    }.get(device['type'], '❓')
-                    
                     active = "🟢 ACTIVE" if i in self.config['active_devices'] else ""
                     selected = "⭐ PRIMARY" if i == self.config['selected_device'] else ""
                     
-                    print(f"{type_emoji} [{i:3d}] {device['name']} {active} {selected}")
+                    lines.append(f"{type_emoji} [{i:3d}] {device['name']} {active} {selected}")
                     
             except Exception as e:
                 continue
         
-        print("=" * 80)
+        lines.append("=" * 80)
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
         return self.available_devices
     
     def _get_device_type(self, name):
-        """Determine device type from name"""
+        """Determine (device type, emoji) from name"""
         name_lower = name.lower()
-        if "what u hear" in name_lower:
-            return "what_u_hear"
-        elif "microphone" in name_lower or "mic" in name_lower:
-            return "microphone"
-        elif "[loopback]" in name_lower or "speaker" in name_lower:
-            return "system_audio"
-        return "unknown"
+        for pattern, device_type, emoji in _DEVICE_TYPES:
+            if pattern in name_lower:
+                return device_type, emoji
+        return 'unknown', '❓'
     
     def start_capture_for_device(self, device_index):
         """Start capturing from a specific device"""
@@ -122,125 +281,205 @@ class ConfigurableAudioCapture:
             print(f"❌ Device {device_index} not found")
             return
         
-        # Start capture thread
-        thread = threading.Thread(
-            target=self._capture_device,
-            args=(device_index, device_info),
-            name=f"Capture-{device_index}"
-        )
-        thread.daemon = True
-        thread.start()
-        
-        self.active_streams[device_index] = {
-            'thread': thread,
-            'info': device_info
-        }
+        entry = self._open_device_stream(device_index, device_info)
+        if entry is not None:
+            self.active_streams[device_index] = entry
+            self._announce_format()
     
-    def _capture_device(self, device_index, device_info):
-        """Capture audio from a specific device"""
-        stream = None
+    def _open_device_stream(self, device_index, device_info):
+        """Open a callback-mode stream for a device
+        
+        PortAudio delivers buffers to the callback on its own thread, so no
+        Python thread sits in a blocking read per device. Returns the
+        active_streams entry, including the format actually sent, or None.
+        """
         try:
             # Use config settings or device defaults
             channels = min(device_info['maxInputChannels'], 2)
             rate = self.config.get('sample_rate', int(device_info['defaultSampleRate']))
             buffer_size = self.config.get('buffer_size', 2048)
             
+            downmix = self.config.get('mono', False) and channels == 2
+            resample_16k = self.config.get('resample_16k', False)
+            resample = make_resampler(rate, 1 if downmix else channels) if resample_16k else None
+            if resample_16k and resample is None and rate != 16000:
+                print(f"⚠️  Can't resample {rate}Hz to 16kHz here - sending {rate}Hz")
+            
+            pin = self.config.get('pin_capture_threads', False)
+            
+            def callback(data, frame_count, time_info, status):
+                nonlocal pin
+                if not self.running:
+                    return (None, pyaudio.paComplete)
+                if pin:
+                    # PortAudio creates the callback thread, so pin it from inside
+                    pin = False
+                    pin_current_thread(device_index)
+                try:
+                    if downmix:
+                        data = downmix_to_mono(data)
+                    if resample:
+                        data = resample(data)
+                    self._enqueue(device_index, data)
+                except Exception as e:
+                    print(f"⚠️  Capture error on device {device_index}: {e}")
+                    return (None, pyaudio.paAbort)
+                return (None, pyaudio.paContinue)
+            
             stream = self.p.open(
                 format=pyaudio.paInt16,
                 channels=channels,
                 rate=rate,
                 input=True,
                 input_device_index=device_index,
-                frames_per_buffer=buffer_size
+                frames_per_buffer=buffer_size,
+                stream_callback=callback
             )
+            stream.start_stream()
             
-            print(f"✅ Started capture: [{device_index}] {device_info['name']} ({rate}Hz, {channels}ch)")
+            print(f"✅ Started capture: [{device_index}] {device_info['name']} ({rate}Hz, {channels}ch"
+                  f"{' -> mono' if downmix else ''}{' -> 16kHz' if resample else ''})")
+            return {
+                'stream': stream,
+                'info': device_info,
+                'channels': 1 if downmix else channels,
+                'rate': 16000 if resample else rate
+            }
             
-            while self.running and device_index in self.active_streams:
-                try:
-                    data = stream.read(buffer_size, exception_on_overflow=False)
-                    if data:
-                        self.audio_queue.put((device_index, data))
-                        
-                except Exception as e:
-                    if self.running:
-                        print(f"⚠️  Capture error on device {device_index}: {e}")
-                    break
-                    
         except Exception as e:
             print(f"❌ Failed to start capture on device {device_index}: {e}")
-        finally:
-            if stream:
-                stream.stop_stream()
-                stream.close()
-            if device_index in self.active_streams:
-                del self.active_streams[device_index]
-            print(f"🛑 Stopped capture: [{device_index}]")
+            return None
     
     def stop_capture_for_device(self, device_index):
         """Stop capturing from a specific device"""
-        if device_index in self.active_streams:
-            del self.active_streams[device_index]
+        entry = self.active_streams.pop(device_index, None)
+        self.recent_levels.pop(device_index, None)
+        self._level_last_computed.pop(device_index, None)
+        if entry is not None:
             print(f"⏹️  Stopping device {device_index}")
+            try:
+                entry['stream'].stop_stream()
+                entry['stream'].close()
+            except Exception as e:
+                print(f"⚠️  Error closing device {device_index}: {e}")
+            print(f"🛑 Stopped capture: [{device_index}]")
+    
+    def _client_info_message(self):
+        """client_info describing the PCM the active devices actually send"""
+        formats = {(entry['channels'], entry['rate']) for entry in self.active_streams.values()}
+        if len(formats) > 1:
+            print(f"⚠️  Active devices send different formats {sorted(formats)} - "
+                  f"the server reads them all as one format")
+        if formats:
+            return _CLIENT_INFO_MESSAGE % max(formats)
+        # Nothing capturing yet - describe what the config will produce
+        return _CLIENT_INFO_MESSAGE % (
+            1 if self.config.get('mono', False) else 2,
+            16000 if self.config.get('resample_16k', False) else self.config.get('sample_rate')
+        )
+    
+    def _announce_format(self):
+        """Re-send client_info if a device change altered the format being sent"""
+        ws = self._audio_ws
+        if ws is None:
+            return
+        message = self._client_info_message()
+        if message != self._announced_info:
+            self._announced_info = message
+            asyncio.run_coroutine_threadsafe(ws.send(message), self._loop)
+    
+    def _enqueue(self, device_index, data):
+        """Hand a captured chunk to the sender (called from capture threads)"""
+        self.audio_queue.append((device_index, data))
+        loop = self._loop
+        if loop is not None and not self._audio_ready.is_set():
+            try:
+                loop.call_soon_threadsafe(self._audio_ready.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
     
     async def stream_to_docker(self):
         """Stream audio to Docker server"""
+        self._audio_ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
         print(f"\n🔗 Connecting to {self.config['server_url']}...")
         
         try:
-            async with websockets.connect(self.config['server_url']) as ws:
+            async with websockets.connect(self.config['server_url'], compression=None) as ws:
                 print("✅ Connected to Docker server!")
                 
                 # Send client info
-                await ws.send(json.dumps({
-                    'type': 'client_info',
-                    'client': 'enhanced_windows_capture',
-                    'mode': 'configurable',
-                    'active_devices': list(self.active_streams.keys())
-                }))
+                self._announced_info = self._client_info_message()
+                await ws.send(self._announced_info)
+                self._audio_ws = ws
                 
                 bytes_sent = 0
                 chunks_sent = 0
-                last_status = time.time()
-                device_stats = {}
+                frames_sent = 0
+                # One send buffer for the whole connection; the library copies it
+                # into the outgoing frame, so it can be refilled after each send
+                frame = bytearray(2 * BATCH_TARGET_BYTES)
+                frame_view = memoryview(frame)
+                last_status = time.monotonic()
                 
                 while self.running:
                     try:
-                        if not self.audio_queue.empty():
-                            device_id, data = self.audio_queue.get_nowait()
-                            
-                            # Send raw audio data
-                            await ws.send(data)
+                        if self.audio_queue:
+                            # Pack everything already queued into the reused frame buffer
+                            size = 0
+                            now = time.monotonic()
+                            while self.audio_queue and size < BATCH_TARGET_BYTES:
+                                device_id, data = self.audio_queue.popleft()
+                                end = size + BATCH_HEADER.size + len(data)
+                                if end > len(frame):
+                                    # Oversized chunk - grow the buffer (the view must go first)
+                                    frame_view.release()
+                                    frame.extend(bytes(end - len(frame)))
+                                    frame_view = memoryview(frame)
+                                BATCH_HEADER.pack_into(frame, size, device_id, len(data))
+                                frame_view[size + BATCH_HEADER.size:end] = data
+                                size = end
+                                
+                                # Update stats
+                                bytes_sent += len(data)
+                                chunks_sent += 1
+                                
+                                # Meter each device from its own chunks, a few times a second
+                                if now - self._level_last_computed.get(device_id, 0) >= 0.25:
+                                    self._level_last_computed[device_id] = now
+                                    self.recent_levels[device_id] = peak_level(data)
                             
-                            # Update stats
-                            bytes_sent += len(data)
-                            chunks_sent += 1
-                            device_stats[device_id] = device_stats.get(device_id, 0) + 1
+                            await ws.send(frame_view[:size])
+                            frames_sent += 1
                             
-                            # Show status every 5 seconds
-                            if time.time() - last_status > 5:
-                                audio_array = np.frombuffer(data, dtype=np.int16)
-                                level = np.max(np.abs(audio_array))
+                            # Show status every 5 seconds - only look at the clock every 64 frames
+                            if frames_sent & 0x3F == 0 and time.monotonic() - last_status > 5:
+                                levels = {device: level for device, level in self.recent_levels.items()
+                                          if device in self.active_streams}
                                 
                                 print(f"\n📊 Status Update:")
                                 print(f"   Total: {chunks_sent} chunks, {bytes_sent:,} bytes")
                                 print(f"   Active devices: {list(self.active_streams.keys())}")
-                                print(f"   Last audio from device {device_id}, Level: {level}")
+                                print(f"   Levels: {levels}")
                                 
-                                # Send audio level to control WebSocket
+                                # Send audio levels to control WebSocket
                                 if self.control_ws:
                                     try:
-                                        await self.control_ws.send(json.dumps({
-                                            'type': 'audio_level',
-                                            'device': device_id,
-                                            'level': int(level)
-                                        }))
+                                        for device, level in levels.items():
+                                            await self.control_ws.send(_LEVEL_MESSAGE % (device, level))
                                     except:
                                         pass
                                 
-                                last_status = time.time()
+                                last_status = time.monotonic()
                         else:
-                            await asyncio.sleep(0.01)
+                            # Sleep until a capture thread signals new audio; re-check
+                            # after clearing in case a chunk landed in between
+                            self._audio_ready.clear()
+                            if not self.audio_queue:
+                                try:
+                                    await asyncio.wait_for(self._audio_ready.wait(), timeout=0.5)
+                                except asyncio.TimeoutError:
+                                    pass
                             
                     except Exception as e:
                         print(f"❌ Stream error: {e}")
@@ -249,6 +488,8 @@ class ConfigurableAudioCapture:
         except Exception as e:
             print(f"❌ Connection error: {e}")
             await asyncio.sleep(2)
+        finally:
+            self._audio_ws = None
     
     async def control_server(self):
         """WebSocket server for web UI control"""
@@ -260,7 +501,7 @@ class ConfigurableAudioCapture:
             
             try:
                 # Send initial status
-                await websocket.send(json.dumps({
+                await websocket.send(json_dumps({
                     'type': 'status',
                     'capturing': self.running,
                     'config': self.config,
@@ -268,12 +509,12 @@ class ConfigurableAudioCapture:
                 }))
                 
                 async for message in websocket:
-                    data = json.loads(message)
+                    data = json_loads(message)
                     command = data.get('command')
                     
                     if command == 'scan':
                         devices = self.scan_devices()
-                        await websocket.send(json.dumps({
+                        await websocket.send(json_dumps({
                             'type': 'devices',
                             'devices': devices
                         }))
@@ -281,7 +522,7 @@ class ConfigurableAudioCapture:
                     elif command == 'save_config':
                         self.config = data.get('config', self.config)
                         self.save_config()
-                        await websocket.send(json.dumps({
+                        await websocket.send(json_dumps({
                             'type': 'config_saved',
                             'success': True
                         }))
@@ -290,13 +531,13 @@ class ConfigurableAudioCapture:
                         # Update config and start capture
                         if 'config' in data:
                             self.config = data['config']
-                            self.save_config()
+                            self._save_pending = True
                         # Restart capture with new config
                         await self.restart_capture()
                     
                     elif command == 'stop':
                         self.stop_all_devices()
-                        await websocket.send(json.dumps({
+                        await websocket.send(json_dumps({
                             'type': 'status',
                             'capturing': False
                         }))
@@ -316,7 +557,7 @@ class ConfigurableAudioCapture:
                         
                         # Update config
                         self.config['active_devices'] = list(new_active)
-                        self.save_config()
+                        self._save_pending = True
                         
             except websockets.exceptions.ConnectionClosed:
                 print("🎮 Control client disconnected")
@@ -390,7 +631,8 @@ async def main():
     # Create tasks
     tasks = [
         asyncio.create_task(capture.stream_to_docker()),
-        asyncio.create_task(capture.control_server())
+        asyncio.create_task(capture.control_server()),
+        asyncio.create_task(capture.save_loop())
     ]
     
     try:
@@ -399,6 +641,8 @@ async def main():
         print("\n🛑 Stopping...")
     finally:
         capture.running = False
+        if capture._save_pending:
+            capture.save_config()
         capture.stop_all_devices()
         capture.p.terminate()
         print("✅ Cleanup complete")
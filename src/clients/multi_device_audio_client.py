@@ -3,35 +3,95 @@ import pyaudiowpatch as pyaudio
 import asyncio
 import websockets
 import numpy as np
-import threading
 import json
-from queue import Queue
+from collections import deque
 import time
 import sys
 import os
+import struct
+import warnings
 from concurrent.futures import ThreadPoolExecutor
 
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # Removed in Python 3.13
+    AUDIOOP_AVAILABLE = True
+except ImportError:
+    AUDIOOP_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _peak_i16(samples):
+        """abs+max in one vectorizable pass, without an int32 temporary"""
+        peak = 0
+        for i in range(samples.shape[0]):
+            v = abs(np.int32(samples[i]))
+            if v > peak:
+                peak = v
+        return peak
+
+def peak_level(data, scratch=None):
+    """Peak absolute sample value of 16-bit PCM bytes
+    
+    scratch is an optional int32 array reused for the numpy fallback's abs
+    instead of allocating a temporary per call.
+    """
+    if AUDIOOP_AVAILABLE:
+        return audioop.max(data, 2)
+    samples = np.frombuffer(data, dtype=np.int16)
+    if NUMBA_AVAILABLE:
+        return int(_peak_i16(samples))
+    if scratch is not None and scratch.size >= samples.size:
+        return int(np.abs(samples, out=scratch[:samples.size], dtype=np.int32).max())
+    return int(np.abs(samples, dtype=np.int32).max())
+
+# Queued chunks are sent together: each one is prefixed with its device
+# index and byte length, up to about BATCH_TARGET_BYTES per frame
+BATCH_HEADER = struct.Struct('<HI')
+BATCH_TARGET_BYTES = 32768
+
 # Platform-specific imports for keyboard handling
 if sys.platform == 'win32':
     import msvcrt
     import asyncio.windows_events
+    import ctypes
 else:
     import termios
     import tty
-    import select
 
 class FixedMultiDeviceCapture:
+    TYPE_EMOJI = {
+        'what_u_hear': '✅',
+        'microphone': '🎤',
+        'system_audio': '🔊',
+        'unknown': '❓'
+    }
+    
     def __init__(self):
         self.p = pyaudio.PyAudio()
-        self.audio_queue = Queue(maxsize=100)  # Limit queue size to prevent memory issues
+        # Capture callbacks append, the sender coroutine pops; the oldest chunks
+        # drop if the connection can't keep up
+        self.audio_queue = deque(maxlen=100)
+        self._audio_ready = None  # asyncio.Event owned by the sender's loop
+        self._loop = None
         self.running = False
-        self.active_devices = {}  # {device_index: (thread, stream, device_info)}
+        self.active_devices = {}  # {device_index: {'stream', 'info', 'scratch'}}
         self.available_devices = []
         self.selected_index = 0
         self.connected = False
         self.recent_levels = {}
+        self._level_last_computed = {}  # device_index -> monotonic time of last meter update
         self.last_ui_update = 0
-        self.executor = ThreadPoolExecutor(max_workers=1)  # For keyboard handling
+        self._prev_frame_lines = []  # Last frame drawn, for redrawing only changed lines
+        # For keyboard polling on Windows; Unix waits on stdin with add_reader
+        self.executor = ThreadPoolExecutor(max_workers=1) if sys.platform == 'win32' else None
         
     def get_all_devices(self):
         """Get all available audio devices"""
@@ -65,68 +125,67 @@ class FixedMultiDeviceCapture:
             return "system_audio"
         return "unknown"
     
-    def draw_ui(self):
-        """Draw the device selection UI"""
-        # Rate limit UI updates
-        if time.time() - self.last_ui_update < 0.1:
-            return
-        self.last_ui_update = time.time()
-        
-        # Clear screen
-        if sys.platform == 'win32':
-            os.system('cls')
-        else:
-            print('\033[2J\033[H')  # ANSI clear screen
+    def draw_ui(self, force=False):
+        """Draw the device selection UI
         
-        print("🎵 Multi-Device Audio Capture Control")
-        print("=" * 80)
-        print("Use ↑/↓ to navigate, SPACE/ENTER to toggle device, Q to quit")
-        print("=" * 80)
-        print()
+        Only lines that changed since the last frame are rewritten, using
+        cursor moves instead of clearing the screen. Periodic refreshes are
+        limited to 4 per second; force=True (keypresses) skips the limit.
+        """
+        now = time.monotonic()
+        if not force and now - self.last_ui_update < 0.25:
+            return
+        self.last_ui_update = now
         
-        # Show connection status
-        status = "🟢 Connected" if self.connected else "🔴 Disconnected"
-        print(f"Server Status: {status}")
-        print()
+        lines = [
+            "🎵 Multi-Device Audio Capture Control",
+            "=" * 80,
+            "Use ↑/↓ to navigate, SPACE/ENTER to toggle device, Q to quit",
+            "=" * 80,
+            "",
+            f"Server Status: {'🟢 Connected' if self.connected else '🔴 Disconnected'}",
+            ""
+        ]
         
         # List devices
         for idx, device in enumerate(self.available_devices):
-            # Device type emoji
-            type_emoji = {
-                'what_u_hear': '✅',
-                'microphone': '🎤',
-                'system_audio': '🔊',
-                'unknown': '❓'
-            }.get(device['type'], '❓')
-            
-            # Selection indicator
-            if idx == self.selected_index:
-                selector = "→"
-            else:
-                selector = " "
-            
-            # Active status
-            if device['index'] in self.active_devices:
-                status = "🟢 ACTIVE"
-            else:
-                status = "⚪ inactive"
-            
-            # Print device line
-            print(f"{selector} {type_emoji} [{device['index']:3d}] {status} {device['name'][:60]}")
+            selector = "→" if idx == self.selected_index else " "
+            status = "🟢 ACTIVE" if device['index'] in self.active_devices else "⚪ inactive"
+            type_emoji = self.TYPE_EMOJI.get(device['type'], '❓')
+            lines.append(f"{selector} {type_emoji} [{device['index']:3d}] {status} {device['name'][:60]}")
         
-        print()
-        print("=" * 80)
-        print(f"Active devices: {len(self.active_devices)}")
-        print(f"Queue size: {self.audio_queue.qsize()}")
+        lines += [
+            "",
+            "=" * 80,
+            f"Active devices: {len(self.active_devices)}",
+            f"Queue size: {len(self.audio_queue)}"
+        ]
         
         # Show recent audio levels
         if self.recent_levels:
-            print("\nAudio Levels:")
+            lines += ["", "Audio Levels:"]
             for device_id, level in list(self.recent_levels.items())[:5]:  # Limit to 5 devices
                 if device_id in self.active_devices:
                     bar_length = min(30, int(level / 1000))
                     bar = "█" * bar_length + "░" * (30 - bar_length)
-                    print(f"  [{device_id:3d}] {bar} {level:5d}")
+                    lines.append(f"  [{device_id:3d}] {bar} {level:5d}")
+        
+        previous = self._prev_frame_lines
+        if lines == previous:
+            return
+        
+        out = [] if previous else ["\033[2J"]  # Full clear on the first frame only
+        for row, line in enumerate(lines, 1):
+            if row > len(previous) or previous[row - 1] != line:
+                out.append(f"\033[{row};1H\033[2K{line}")
+        # Blank out rows left over from a longer previous frame
+        for row in range(len(lines) + 1, len(previous) + 1):
+            out.append(f"\033[{row};1H\033[2K")
+        out.append(f"\033[{len(lines) + 1};1H")
+        
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+        self._prev_frame_lines = lines
     
     def toggle_device(self, device_index):
         """Toggle device on/off"""
@@ -141,33 +200,21 @@ class FixedMultiDeviceCapture:
             return False
             
         # Find device info
-        device_info = None
-        for i in range(self.p.get_device_count()):
-            try:
-                info = self.p.get_device_info_by_index(i)
-                if i == device_index:
-                    device_info = info
-                    break
-            except Exception:
-                continue
-                
-        if not device_info:
+        try:
+            device_info = self.p.get_device_info_by_index(device_index)
+        except Exception:
             return False
             
-        # Start capture thread
-        thread = threading.Thread(
-            target=self._capture_worker,
-            args=(device_index, device_info),
-            name=f"Capture-{device_index}"
-        )
-        thread.daemon = True
-        thread.start()
+        stream = self._open_device_stream(device_index, device_info)
+        if stream is None:
+            return False
         
         # Store in active devices
         self.active_devices[device_index] = {
-            'thread': thread,
-            'stream': None,
-            'info': device_info
+            'stream': stream,
+            'info': device_info,
+            # Reused by the level meter, sized for one buffer
+            'scratch': np.empty(2048 * min(device_info['maxInputChannels'], 2), dtype=np.int32)
         }
         
         return True
@@ -177,22 +224,32 @@ class FixedMultiDeviceCapture:
         if device_index not in self.active_devices:
             return False
             
-        # Remove from active devices (thread will detect and stop)
-        del self.active_devices[device_index]
+        device_data = self.active_devices.pop(device_index)
+        try:
+            device_data['stream'].stop_stream()
+            device_data['stream'].close()
+        except Exception:
+            pass
         
         # Clear level data
-        if device_index in self.recent_levels:
-            del self.recent_levels[device_index]
+        self.recent_levels.pop(device_index, None)
+        self._level_last_computed.pop(device_index, None)
             
         return True
     
-    def _capture_worker(self, device_index, device_info):
-        """Worker thread for capturing audio from a device"""
-        stream = None
-        consecutive_errors = 0
+    def _open_device_stream(self, device_index, device_info):
+        """Open a callback-mode stream for a device
+        
+        PortAudio hands each buffer to the callback on its own thread, so
+        there is no Python thread per device sitting in a blocking read.
+        """
+        def callback(data, frame_count, time_info, status):
+            if not self.running:
+                return (None, pyaudio.paComplete)
+            self._enqueue(device_index, data)
+            return (None, pyaudio.paContinue)
         
         try:
-            # Open audio stream with more robust settings
             stream = self.p.open(
                 format=pyaudio.paInt16,
                 channels=min(device_info['maxInputChannels'], 2),
@@ -200,48 +257,27 @@ class FixedMultiDeviceCapture:
                 input=True,
                 input_device_index=device_index,
                 frames_per_buffer=2048,
-                stream_callback=None  # Use blocking mode
+                stream_callback=callback
             )
-            
-            # Update stream reference
-            if device_index in self.active_devices:
-                self.active_devices[device_index]['stream'] = stream
-            
-            while self.running and device_index in self.active_devices:
-                try:
-                    # Read with timeout
-                    data = stream.read(2048, exception_on_overflow=False)
-                    if data:
-                        # Only queue if there's space
-                        if not self.audio_queue.full():
-                            self.audio_queue.put((device_index, data), block=False)
-                        consecutive_errors = 0
-                    else:
-                        time.sleep(0.001)
-                        
-                except Exception as e:
-                    consecutive_errors += 1
-                    if consecutive_errors > 10:
-                        break
-                    time.sleep(0.01)
-                    
-        except Exception as e:
-            pass
-        finally:
-            # Cleanup
-            if stream:
-                try:
-                    stream.stop_stream()
-                    stream.close()
-                except:
-                    pass
-            
-            # Remove from active devices if still there
-            if device_index in self.active_devices:
-                del self.active_devices[device_index]
+            stream.start_stream()
+            return stream
+        except Exception:
+            return None
+    
+    def _enqueue(self, device_index, data):
+        """Hand a captured chunk to the sender (called from capture callbacks)"""
+        self.audio_queue.append((device_index, data))
+        loop = self._loop
+        if loop is not None and not self._audio_ready.is_set():
+            try:
+                loop.call_soon_threadsafe(self._audio_ready.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
     
     async def stream_to_docker(self):
         """Stream audio to Docker with reconnection logic"""
+        self._audio_ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
         reconnect_delay = 1
         
         while self.running:
@@ -250,7 +286,8 @@ class FixedMultiDeviceCapture:
                     'ws://localhost:8766',
                     ping_interval=20,
                     ping_timeout=10,
-                    close_timeout=10
+                    close_timeout=10,
+                    compression=None  # PCM doesn't deflate well
                 ) as ws:
                     self.connected = True
                     reconnect_delay = 1  # Reset delay on successful connection
@@ -259,28 +296,54 @@ class FixedMultiDeviceCapture:
                     await ws.send(json.dumps({
                         'type': 'client_info',
                         'client': 'fixed_multi_device_capture',
-                        'mode': 'raw_passthrough'
+                        'mode': 'raw_passthrough',
+                        'framing': 'batched'
                     }))
                     
+                    # One send buffer for the whole connection; the library copies it
+                    # into the outgoing frame, so it can be refilled after each send
+                    frame = bytearray(2 * BATCH_TARGET_BYTES)
+                    frame_view = memoryview(frame)
+                    
                     while self.running and not ws.closed:
                         try:
-                            # Get audio with timeout
-                            try:
-                                device_id, data = self.audio_queue.get(timeout=0.1)
-                                
-                                # Send raw audio data
-                                await asyncio.wait_for(ws.send(data), timeout=5.0)
-                                
-                                # Update audio levels
-                                audio_array = np.frombuffer(data, dtype=np.int16)
-                                level = np.max(np.abs(audio_array))
-                                self.recent_levels[device_id] = level
-                                
-                            except asyncio.TimeoutError:
-                                continue
-                            except Queue.Empty:
+                            if not self.audio_queue:
+                                # Sleep until a capture callback signals new audio; re-check
+                                # after clearing in case a chunk landed in between
+                                self._audio_ready.clear()
+                                if not self.audio_queue:
+                                    try:
+                                        await asyncio.wait_for(self._audio_ready.wait(), timeout=0.5)
+                                    except asyncio.TimeoutError:
+                                        pass
                                 continue
+                            
+                            # Pack everything already queued into one frame
+                            size = 0
+                            now = time.monotonic()
+                            while self.audio_queue and size < BATCH_TARGET_BYTES:
+                                device_id, data = self.audio_queue.popleft()
+                                end = size + BATCH_HEADER.size + len(data)
+                                if end > len(frame):
+                                    # Oversized chunk - grow the buffer (the view must go first)
+                                    frame_view.release()
+                                    frame.extend(bytes(end - len(frame)))
+                                    frame_view = memoryview(frame)
+                                BATCH_HEADER.pack_into(frame, size, device_id, len(data))
+                                frame_view[size + BATCH_HEADER.size:end] = data
+                                size = end
                                 
+                                # Update audio levels - the UI can't show more than ~10 per second
+                                if now - self._level_last_computed.get(device_id, 0) >= 0.1:
+                                    self._level_last_computed[device_id] = now
+                                    device_data = self.active_devices.get(device_id)
+                                    self.recent_levels[device_id] = peak_level(
+                                        data, device_data['scratch'] if device_data else None)
+                            
+                            await asyncio.wait_for(ws.send(frame_view[:size]), timeout=5.0)
+                                
+                        except asyncio.TimeoutError:
+                            continue
                         except websockets.exceptions.ConnectionClosed:
                             break
                         except Exception:
@@ -291,6 +354,14 @@ class FixedMultiDeviceCapture:
                 await asyncio.sleep(min(reconnect_delay, 30))
                 reconnect_delay *= 2  # Exponential backoff
 
+def enable_vt_mode_windows():
+    """Let the Windows console interpret the ANSI escapes draw_ui writes"""
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+    mode = ctypes.c_uint32()
+    if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+
 def get_key_windows():
     """Get a single keypress on Windows"""
     if msvcrt.kbhit():
@@ -310,58 +381,80 @@ def get_key_windows():
             return 'q'
     return None
 
-def get_key_unix():
-    """Get a single keypress on Unix/Linux/Mac"""
-    if select.select([sys.stdin], [], [], 0)[0]:
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            key = sys.stdin.read(1)
-            
-            if key == '\x1b':  # ESC sequence
-                if select.select([sys.stdin], [], [], 0)[0]:
-                    key2 = sys.stdin.read(1)
-                    if key2 == '[' and select.select([sys.stdin], [], [], 0)[0]:
-                        key3 = sys.stdin.read(1)
-                        if key3 == 'A':
-                            return 'up'
-                        elif key3 == 'B':
-                            return 'down'
-            elif key == ' ':
-                return 'space'
-            elif key == '\r' or key == '\n':
-                return 'enter'
-            elif key.lower() == 'q':
-                return 'q'
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-    return None
+_UNIX_KEYS = {' ': 'space', '\r': 'enter', '\n': 'enter', 'q': 'q', 'Q': 'q'}
+_UNIX_ARROWS = {'A': 'up', 'B': 'down'}
+
+def parse_keys_unix(buffer):
+    """Split terminal input into key names
+    
+    Returns (keys, rest) where rest is an escape sequence whose remaining
+    bytes haven't arrived yet.
+    """
+    keys = []
+    i = 0
+    while i < len(buffer):
+        ch = buffer[i]
+        if ch == '\x1b':  # ESC sequence
+            if buffer[i:] in ('\x1b', '\x1b['):
+                break
+            if buffer[i + 1] == '[':
+                key = _UNIX_ARROWS.get(buffer[i + 2])
+                if key:
+                    keys.append(key)
+                i += 3
+                continue
+        elif ch in _UNIX_KEYS:
+            keys.append(_UNIX_KEYS[ch])
+        i += 1
+    return keys, buffer[i:]
+
+def handle_key(capture, key):
+    """Apply one keypress to the device list"""
+    if key == 'up' and capture.selected_index > 0:
+        capture.selected_index -= 1
+        capture.draw_ui(force=True)
+    elif key == 'down' and capture.selected_index < len(capture.available_devices) - 1:
+        capture.selected_index += 1
+        capture.draw_ui(force=True)
+    elif key in ['space', 'enter']:
+        if capture.selected_index < len(capture.available_devices):
+            device = capture.available_devices[capture.selected_index]
+            capture.toggle_device(device['index'])
+            capture.draw_ui(force=True)
+    elif key == 'q':
+        capture.running = False
 
 async def handle_keyboard_input(capture):
     """Handle keyboard input asynchronously"""
-    get_key = get_key_windows if sys.platform == 'win32' else get_key_unix
+    if sys.platform != 'win32':
+        # The terminal is already in cbreak mode - let the loop tell us when
+        # stdin is readable instead of polling it
+        loop = asyncio.get_running_loop()
+        fd = sys.stdin.fileno()
+        pending = ''
+        
+        def on_stdin_readable():
+            nonlocal pending
+            keys, pending = parse_keys_unix(pending + os.read(fd, 64).decode(errors='ignore'))
+            for key in keys:
+                handle_key(capture, key)
+        
+        loop.add_reader(fd, on_stdin_readable)
+        try:
+            while capture.running:
+                await asyncio.sleep(0.5)
+        finally:
+            loop.remove_reader(fd)
+        return
     
     while capture.running:
-        # Check for keyboard input in executor to avoid blocking
+        # msvcrt has no fd to wait on - poll it in the executor to avoid blocking
         key = await asyncio.get_event_loop().run_in_executor(
-            capture.executor, get_key
+            capture.executor, get_key_windows
         )
         
         if key:
-            if key == 'up' and capture.selected_index > 0:
-                capture.selected_index -= 1
-                capture.draw_ui()
-            elif key == 'down' and capture.selected_index < len(capture.available_devices) - 1:
-                capture.selected_index += 1
-                capture.draw_ui()
-            elif key in ['space', 'enter']:
-                if capture.selected_index < len(capture.available_devices):
-                    device = capture.available_devices[capture.selected_index]
-                    capture.toggle_device(device['index'])
-                    capture.draw_ui()
-            elif key == 'q':
-                capture.running = False
+            handle_key(capture, key)
         
         await asyncio.sleep(0.05)
 
@@ -385,8 +478,10 @@ async def main():
     
     capture.running = True
     
-    # Setup terminal for Unix
-    if sys.platform != 'win32':
+    # Setup terminal
+    if sys.platform == 'win32':
+        enable_vt_mode_windows()
+    else:
         old_settings = termios.tcgetattr(sys.stdin)
         tty.setcbreak(sys.stdin.fileno())
     
@@ -403,7 +498,7 @@ async def main():
                     break
         
         # Initial UI draw
-        capture.draw_ui()
+        capture.draw_ui(force=True)
         
         # Create tasks
         tasks = [
@@ -424,22 +519,15 @@ async def main():
             termios.tcsetattr(sys.stdin, termios.TCSADRAIN, old_settings)
         
         # Cleanup
-        capture.executor.shutdown(wait=False)
+        if capture.executor:
+            capture.executor.shutdown(wait=False)
         
-        if sys.platform == 'win32':
-            os.system('cls')
-        else:
-            print('\033[2J\033[H')
-            
+        print('\033[2J\033[H', end='')
         print("🛑 Shutting down...")
         
         # Close all streams
-        for device_id, device_data in list(capture.active_devices.items()):
-            if device_data.get('stream'):
-                try:
-                    device_data['stream'].close()
-                except:
-                    pass
+        for device_id in list(capture.active_devices):
+            capture.stop_device_capture(device_id)
                     
         capture.p.terminate()
         print("✅ Cleanup complete")
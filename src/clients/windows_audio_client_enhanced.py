@@ -10,6 +10,8 @@ import signal
 import sys
 from threading import Thread, Event
 from queue import Queue
+from collections import deque
+from array import array
 import time
 
 logging.basicConfig(
@@ -18,24 +20,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Indexes into WindowsAudioCapture._counters
+BYTES_CAPTURED, CHUNKS_CAPTURED, BYTES_SENT, CHUNKS_SENT = range(4)
+
 class WindowsAudioCapture:
     def __init__(self, mode='loopback', server_url='ws://localhost:8766', device_index=None):
         self.mode = mode
         self.server_url = server_url
         self.device_index = device_index
         self.audio = pyaudio.PyAudio()
-        self.audio_queue = Queue()
+        self.audio_queue = deque(maxlen=200)  # ~8s at 48kHz; oldest dropped when full
+        self._audio_ready = None  # asyncio.Event owned by the sender's loop
+        self._loop = None
         self.command_queue = Queue()
         self.running = False
         self.websocket = None
         self.ws_task = None
         self.capture_thread = None
-        self.stats = {
-            'bytes_captured': 0,
-            'bytes_sent': 0,
-            'chunks_captured': 0,
-            'chunks_sent': 0,
-            'start_time': time.time()
+        # Hot-path counters, see the stats property for the named view
+        self._counters = array('Q', [0, 0, 0, 0])
+        self.start_time = time.time()
+    
+    @property
+    def stats(self):
+        """Capture/send statistics as a dict"""
+        counters = self._counters
+        return {
+            'bytes_captured': counters[BYTES_CAPTURED],
+            'bytes_sent': counters[BYTES_SENT],
+            'chunks_captured': counters[CHUNKS_CAPTURED],
+            'chunks_sent': counters[CHUNKS_SENT],
+            'start_time': self.start_time
         }
         
     def get_devices(self):
@@ -258,12 +273,12 @@ class WindowsAudioCapture:
                 try:
                     data = stream.read(2048, exception_on_overflow=False)
                     if data:
-                        self.audio_queue.put(data)
-                        self.stats['bytes_captured'] += len(data)
-                        self.stats['chunks_captured'] += 1
+                        self._queue_latest(data)
+                        self._counters[BYTES_CAPTURED] += len(data)
+                        self._counters[CHUNKS_CAPTURED] += 1
                         
                         # Check audio level periodically
-                        if self.stats['chunks_captured'] % 50 == 0:
+                        if self._counters[CHUNKS_CAPTURED] % 50 == 0:
                             audio_array = np.frombuffer(data, dtype=np.int16)
                             max_level = np.max(np.abs(audio_array))
                             if max_level > 100:
@@ -281,6 +296,20 @@ class WindowsAudioCapture:
             import traceback
             traceback.print_exc()
     
+    def _queue_latest(self, item):
+        """Queue captured audio, dropping the oldest chunk when the queue is full
+        
+        Never blocks the capture thread; stale audio is worth less than
+        keeping up with the live stream. Wakes the sender on its event loop.
+        """
+        self.audio_queue.append(item)
+        loop = self._loop
+        if loop is not None and not self._audio_ready.is_set():
+            try:
+                loop.call_soon_threadsafe(self._audio_ready.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+    
     def _generate_test_audio(self):
         """Generate test audio for testing"""
         logger.info("Generating test audio...")
@@ -295,9 +324,9 @@ class WindowsAudioCapture:
             audio_int16 = (audio * 32767).astype(np.int16)
             
             data = audio_int16.tobytes()
-            self.audio_queue.put(data)
-            self.stats['bytes_captured'] += len(data)
-            self.stats['chunks_captured'] += 1
+            self._queue_latest(data)
+            self._counters[BYTES_CAPTURED] += len(data)
+            self._counters[CHUNKS_CAPTURED] += 1
             
             time.sleep(chunk_size / sample_rate)
     
@@ -305,22 +334,25 @@ class WindowsAudioCapture:
         """Print status periodically"""
         while self.running:
             time.sleep(5)
-            runtime = time.time() - self.stats['start_time']
-            capture_rate = self.stats['bytes_captured'] / runtime
-            send_rate = self.stats['bytes_sent'] / runtime
+            stats = self.stats
+            runtime = time.time() - stats['start_time']
+            capture_rate = stats['bytes_captured'] / runtime
+            send_rate = stats['bytes_sent'] / runtime
             
             logger.info(f"""
 📊 Audio Bridge Status:
    Runtime: {runtime:.1f}s
-   Captured: {self.stats['chunks_captured']} chunks, {self.stats['bytes_captured']:,} bytes
-   Sent: {self.stats['chunks_sent']} chunks, {self.stats['bytes_sent']:,} bytes
+   Captured: {stats['chunks_captured']} chunks, {stats['bytes_captured']:,} bytes
+   Sent: {stats['chunks_sent']} chunks, {stats['bytes_sent']:,} bytes
    Capture rate: {capture_rate:.1f} bytes/sec
    Send rate: {send_rate:.1f} bytes/sec
-   Queue size: {self.audio_queue.qsize()}
+   Queue size: {len(self.audio_queue)}
 """)
     
     async def _stream_audio(self):
         """Stream audio to server via WebSocket"""
+        self._audio_ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
         retry_count = 0
         
         while self.running and retry_count < 5:
@@ -330,7 +362,8 @@ class WindowsAudioCapture:
                 async with websockets.connect(
                     self.server_url,
                     ping_interval=20,
-                    ping_timeout=10
+                    ping_timeout=10,
+                    compression=None  # PCM doesn't deflate well
                 ) as websocket:
                     self.websocket = websocket
                     logger.info("✅ Connected to Docker transcriber")
@@ -351,14 +384,21 @@ class WindowsAudioCapture:
                     # Stream audio
                     while self.running:
                         try:
-                            # Get audio from queue
-                            if not self.audio_queue.empty():
-                                data = self.audio_queue.get_nowait()
-                                await websocket.send(data)
-                                self.stats['bytes_sent'] += len(data)
-                                self.stats['chunks_sent'] += 1
-                            else:
-                                await asyncio.sleep(0.01)
+                            if not self.audio_queue:
+                                # Sleep until the capture thread signals new audio; re-check
+                                # after clearing in case a chunk landed in between
+                                self._audio_ready.clear()
+                                if not self.audio_queue:
+                                    try:
+                                        await asyncio.wait_for(self._audio_ready.wait(), timeout=0.5)
+                                    except asyncio.TimeoutError:
+                                        pass
+                                continue
+                            data = self.audio_queue.popleft()
+                            
+                            await websocket.send(data)
+                            self._counters[BYTES_SENT] += len(data)
+                            self._counters[CHUNKS_SENT] += 1
                                 
                         except asyncio.CancelledError:
                             break
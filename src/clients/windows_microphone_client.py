@@ -5,14 +5,16 @@ import websockets
 import numpy as np
 import threading
 import json
-from queue import Queue
+from collections import deque
 import time
 import sys
 
 class MicrophoneCaptureWithBoost:
     def __init__(self):
         self.p = pyaudio.PyAudio()
-        self.audio_queue = Queue()
+        self.audio_queue = deque(maxlen=200)  # ~17s at 48kHz; oldest dropped when full
+        self._audio_ready = None  # asyncio.Event owned by the sender's loop
+        self._loop = None
         self.running = False
         self.current_mic = None
         
@@ -22,6 +24,20 @@ class MicrophoneCaptureWithBoost:
         self.target_peak = 10000  # Target peak level (out of 32768)
         self.gain_history = []
         
+    def _queue_latest(self, item):
+        """Queue captured audio, dropping the oldest chunk when the queue is full
+        
+        Never blocks the capture thread; stale audio is worth less than
+        keeping up with the live stream. Wakes the sender on its event loop.
+        """
+        self.audio_queue.append(item)
+        loop = self._loop
+        if loop is not None and not self._audio_ready.is_set():
+            try:
+                loop.call_soon_threadsafe(self._audio_ready.set)
+            except RuntimeError:
+                pass  # Loop already closed during shutdown
+    
     def find_microphones(self):
         """Find all available microphone devices"""
         microphones = []
@@ -241,7 +257,7 @@ class MicrophoneCaptureWithBoost:
                         boosted_data = self.apply_audio_boost(data)
                         
                         # Queue the boosted audio data
-                        self.audio_queue.put((microphone['index'], boosted_data))
+                        self._queue_latest((microphone['index'], boosted_data))
                         total_frames += 1
                         
                         # Occasional status update
@@ -267,6 +283,8 @@ class MicrophoneCaptureWithBoost:
     
     async def stream_to_docker(self):
         """Stream microphone audio to Docker"""
+        self._audio_ready = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
         print("\n🔗 Connecting to transcription server...")
         
         reconnect_attempts = 0
@@ -274,7 +292,7 @@ class MicrophoneCaptureWithBoost:
         
         while reconnect_attempts < max_reconnects:
             try:
-                async with websockets.connect('ws://localhost:8766') as ws:
+                async with websockets.connect('ws://localhost:8766', compression=None) as ws:
                     print("✅ Connected to transcription server!")
                     reconnect_attempts = 0  # Reset on successful connection
                     
@@ -294,57 +312,62 @@ class MicrophoneCaptureWithBoost:
                     
                     while self.running:
                         try:
-                            # Get audio from queue with timeout
-                            if not self.audio_queue.empty():
-                                device_id, data = self.audio_queue.get_nowait()
+                            if not self.audio_queue:
+                                # Sleep until the capture thread signals new audio; re-check
+                                # after clearing in case a chunk landed in between
+                                self._audio_ready.clear()
+                                if not self.audio_queue:
+                                    try:
+                                        await asyncio.wait_for(self._audio_ready.wait(), timeout=0.5)
+                                    except asyncio.TimeoutError:
+                                        pass
+                                continue
+                            device_id, data = self.audio_queue.popleft()
+                            
+                            # Send raw audio data
+                            await ws.send(data)
+                            
+                            bytes_sent += len(data)
+                            chunks_sent += 1
+                            
+                            # Calculate audio level
+                            audio_array = np.frombuffer(data, dtype=np.int16)
+                            level = np.max(np.abs(audio_array))
+                            rms = np.sqrt(np.mean(audio_array**2))
+                            
+                            # Show detailed status every 5 seconds
+                            if time.time() - last_status > 5:
+                                # Create level meter
+                                max_bar = 30
+                                level_bar = int((level / 32768) * max_bar)
+                                rms_bar = int((rms / 32768) * max_bar)
+                                
+                                level_meter = "█" * level_bar + "░" * (max_bar - level_bar)
+                                rms_meter = "█" * rms_bar + "░" * (max_bar - rms_bar)
                                 
-                                # Send raw audio data
-                                await ws.send(data)
+                                print(f"\n📊 Audio Status:")
+                                print(f"   Chunks sent: {chunks_sent:,}")
+                                print(f"   Data sent: {bytes_sent:,} bytes ({bytes_sent/1024/1024:.1f} MB)")
+                                print(f"   Peak level: [{level_meter}] {level:5d} (boosted)")
+                                print(f"   RMS level:  [{rms_meter}] {int(rms):5d}")
+                                print(f"   Current boost: {self.boost_factor:.1f}x")
                                 
-                                bytes_sent += len(data)
-                                chunks_sent += 1
+                                # Level feedback
+                                if level < 3000:
+                                    print("   ⚠️  Still too quiet - speak louder or move closer")
+                                elif level > 28000:
+                                    print("   ⚠️  Getting loud - possible distortion")
+                                else:
+                                    print("   ✅ Good audio level")
                                 
-                                # Calculate audio level
-                                audio_array = np.frombuffer(data, dtype=np.int16)
-                                level = np.max(np.abs(audio_array))
-                                rms = np.sqrt(np.mean(audio_array**2))
+                                last_status = time.time()
                                 
-                                # Show detailed status every 5 seconds
-                                if time.time() - last_status > 5:
-                                    # Create level meter
-                                    max_bar = 30
-                                    level_bar = int((level / 32768) * max_bar)
-                                    rms_bar = int((rms / 32768) * max_bar)
-                                    
-                                    level_meter = "█" * level_bar + "░" * (max_bar - level_bar)
-                                    rms_meter = "█" * rms_bar + "░" * (max_bar - rms_bar)
-                                    
-                                    print(f"\n📊 Audio Status:")
-                                    print(f"   Chunks sent: {chunks_sent:,}")
-                                    print(f"   Data sent: {bytes_sent:,} bytes ({bytes_sent/1024/1024:.1f} MB)")
-                                    print(f"   Peak level: [{level_meter}] {level:5d} (boosted)")
-                                    print(f"   RMS level:  [{rms_meter}] {int(rms):5d}")
-                                    print(f"   Current boost: {self.boost_factor:.1f}x")
-                                    
-                                    # Level feedback
-                                    if level < 3000:
-                                        print("   ⚠️  Still too quiet - speak louder or move closer")
-                                    elif level > 28000:
-                                        print("   ⚠️  Getting loud - possible distortion")
-                                    else:
-                                        print("   ✅ Good audio level")
-                                    
-                                    last_status = time.time()
-                                    
-                                # Quick level indicator every second
-                                elif time.time() - last_level_log > 1:
-                                    level_chars = " ▁▂▃▄▅▆▇█"
-                                    level_idx = min(int((level / 32768) * len(level_chars)), len(level_chars) - 1)
-                                    print(f"\r🎙️ {level_chars[level_idx]} Level: {level:5d} | Boost: {self.boost_factor:.1f}x ", end='', flush=True)
-                                    last_level_log = time.time()
-                                    
-                            else:
-                                await asyncio.sleep(0.01)
+                            # Quick level indicator every second
+                            elif time.time() - last_level_log > 1:
+                                level_chars = " ▁▂▃▄▅▆▇█"
+                                level_idx = min(int((level / 32768) * len(level_chars)), len(level_chars) - 1)
+                                print(f"\r🎙️ {level_chars[level_idx]} Level: {level:5d} | Boost: {self.boost_factor:.1f}x ", end='', flush=True)
+                                last_level_log = time.time()
                                 
                         except websockets.exceptions.ConnectionClosed:
                             print("\n❌ Lost connection to server")